@@ -5,9 +5,12 @@ Provides functionality for loading and retrieving basemap
 configurations from a JSON file.
 """
 
+import hashlib
 import os
 import json
 
+import orjson
+
 class BasemapManager:
     """
     Manages basemap configurations loaded from a JSON file.
@@ -28,6 +31,13 @@ class BasemapManager:
             self.config = json.load(f)
             self._basemap_lookup = {b['id']: b for b in self.config.get('basemaps', [])}
 
+        # Basemaps never change at runtime; encode them once for the basemap endpoints
+        self._basemaps_json = orjson.dumps(self.config.get('basemaps', []))
+        self._basemaps_etag = hashlib.sha256(self._basemaps_json).hexdigest()
+        self._basemap_json_lookup = {
+            basemap_id: orjson.dumps(basemap) for basemap_id, basemap in self._basemap_lookup.items()
+        }
+
     def list_basemaps(self):
         """
         Return the list of available basemaps.
@@ -37,6 +47,15 @@ class BasemapManager:
 
         return self.config.get('basemaps', [])
 
+    def list_basemaps_json(self):
+        """
+        Return the list of available basemaps pre-encoded as JSON.
+
+        :return: Tuple of (JSON bytes, ETag derived from those bytes).
+        """
+
+        return self._basemaps_json, self._basemaps_etag
+
     def get_basemap(self, basemap_id):
         """
         Retrieve a basemap by its identifier.
@@ -46,3 +65,13 @@ class BasemapManager:
         """
 
         return self._basemap_lookup.get(basemap_id)
+
+    def get_basemap_json(self, basemap_id):
+        """
+        Retrieve a basemap by its identifier, pre-encoded as JSON.
+
+        :param basemap_id: Unique identifier of the basemap.
+        :return: JSON bytes of the basemap configuration or None if not found.
+        """
+
+        return self._basemap_json_lookup.get(basemap_id)
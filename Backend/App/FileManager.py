@@ -7,6 +7,7 @@ files while managing application directories.
 
 import shutil
 import os
+import zipfile
 
 
 class FileManager:
@@ -18,6 +19,9 @@ class FileManager:
     # Allowed file extensions for processing
     allowed_extensions = {'.geojson', '.shp', '.gpkg', '.tif', '.tiff'}
 
+    # Chunk size for streamed copies (1 MiB keeps CRC32/deflate work in large C-level calls)
+    COPY_BUFSIZE = 1024 * 1024
+
     def __init__(
             self,
             layers_dir='./data/input_layers',
@@ -73,6 +77,9 @@ class FileManager:
         """
         Copy a file to a destination directory.
 
+        The contents are copied in-kernel via clone_file; permission bits are
+        not carried over.
+
         :param source_path: Full path to the source file.
         :param destination_path: Target directory.
         :return: True if the copy was successful.
@@ -85,11 +92,93 @@ class FileManager:
         destination_file = os.path.join(destination_path, file_name)
 
         try:
-            shutil.copy(source_path, destination_file)
+            self.clone_file(source_path, destination_file)
         except Exception as e:
             raise ValueError(f"Error copying file: {e}") from e
         return True
 
+    @staticmethod
+    def clone_file(source_path, destination_file):
+        """
+        Copy a file's contents without passing them through user space.
+
+        Uses os.copy_file_range, which shares extents (reflink) on copy-on-write
+        filesystems such as Btrfs/XFS and copies in-kernel elsewhere. Falls back
+        to shutil.copyfile when the syscall is unavailable or unsupported.
+
+        :param source_path: Full path to the source file.
+        :param destination_file: Full path of the file to create.
+        """
+
+        with open(source_path, 'rb') as src, open(destination_file, 'wb') as dst:
+            remaining = os.fstat(src.fileno()).st_size
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                return
+            except (AttributeError, OSError):
+                # Not Linux, or a filesystem pair the kernel can't copy between
+                pass
+
+        shutil.copyfile(source_path, destination_file)
+
+    @staticmethod
+    def add_file_to_zip(zipf, source_path, arcname, compress_type=zipfile.ZIP_DEFLATED):
+        """
+        Add a file to an open ZIP archive, streaming it in COPY_BUFSIZE chunks.
+
+        ZipFile.write copies in 8 KiB chunks; larger chunks cut the per-chunk
+        overhead of CRC32 and compression on big layer files.
+
+        :param zipf: ZipFile opened for writing.
+        :param source_path: Path of the file to add.
+        :param arcname: Name of the file inside the archive.
+        :param compress_type: zipfile compression method for this member.
+        """
+
+        if compress_type == zipf.compression:
+            # Opened by name, the member gets the archive's compression method and level from zipfile
+            member = arcname
+        else:
+            member = zipfile.ZipInfo.from_file(source_path, arcname)
+            member.compress_type = compress_type
+
+        # Zip64 extra fields are only added for members too large to do without them
+        force_zip64 = os.path.getsize(source_path) >= zipfile.ZIP64_LIMIT
+
+        with open(source_path, 'rb') as src, zipf.open(member, 'w', force_zip64=force_zip64) as dst:
+            shutil.copyfileobj(src, dst, FileManager.COPY_BUFSIZE)
+
+    @staticmethod
+    def extract_zip_members(zipf, members, destination_dir):
+        """
+        Extract the given ZIP members flat into a directory, streaming in COPY_BUFSIZE chunks.
+
+        Each member is written under its base name, so archive paths cannot
+        escape destination_dir. Directory entries are skipped.
+
+        :param zipf: ZipFile opened for reading.
+        :param members: Names of the members to extract.
+        :param destination_dir: Existing directory to extract into.
+        :return: List of paths of the extracted files.
+        """
+
+        extracted = []
+        for member in members:
+            file_name = os.path.basename(member)
+            if not file_name:
+                continue
+
+            destination_file = os.path.join(destination_dir, file_name)
+            with zipf.open(member) as src, open(destination_file, 'wb') as dst:
+                shutil.copyfileobj(src, dst, FileManager.COPY_BUFSIZE)
+            extracted.append(destination_file)
+
+        return extracted
+
     #=====================================================================================
     #                               HELPER METHODS
     #=====================================================================================
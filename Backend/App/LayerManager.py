@@ -19,12 +19,19 @@ import os
 import shutil
 import uuid
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 
 import fiona
 import geopandas as gpd
+import numpy as np
+import orjson
+import pyogrio
 import rasterio
 import rioxarray
-from fiona.errors import FionaValueError
+import shapely
+from rasterio.enums import Resampling
+from rasterio.shutil import copy as rio_copy
+from rasterio.vrt import WarpedVRT
 from rasterio.warp import transform_bounds
 from werkzeug.exceptions import NotFound
 
@@ -32,6 +39,9 @@ from .FileManager import FileManager
 
 file_manager = FileManager()
 
+# GDAL-backed vectorized I/O for every geopandas read/write (geopandas < 1.0 defaulted to fiona)
+VECTOR_IO_ENGINE = "pyogrio"
+
 class LayerManager:
     """
     Manages geospatial layers including import, export, and metadata operations.
@@ -41,6 +51,7 @@ class LayerManager:
     """
 
     MAX_LAYER_FILE_SIZE = 1000 * 1024 * 1024 # 1000 MB
+    MAX_IMPORT_WORKERS = 8 # Threads used to import the layers of one GeoPackage
     def __init__(self):
         """
         Initialize LayerManager and perform integrity checks on existing layers.
@@ -52,6 +63,9 @@ class LayerManager:
         # Default GeoPackage path for vector layers
         self.default_gpkg_path = os.path.join(file_manager.layers_dir, "default.gpkg")
 
+        # layer_id -> ((mtime_ns, size), info) for get_layer_information
+        self.__layer_information_cache = {}
+
         # Supported layer formats
         supported_ext = {'.gpkg', '.tif', '.tiff'}
 
@@ -110,13 +124,22 @@ class LayerManager:
         :return: Tuple of (new_gpkg_id, metadata) where new_gpkg_id is a UUID and metadata a dict.
         :raises ValueError: If ZIP is invalid, no .shp file found, no CRS, or processing fails.
         """
-        # 1. Extract ZIP
+        # 1. Locate the .shp file from the ZIP's member list, then extract only its components
         temp_dir = os.path.join(file_manager.temp_dir, "shp_extracted")
-        os.makedirs(temp_dir, exist_ok=True)
 
         try:
             with zipfile.ZipFile(zip_path, 'r') as zf:
-                zf.extractall(temp_dir)
+                names = zf.namelist()
+                shp_files = [
+                    name for name in names
+                    if "/" not in name and name.lower().endswith('.shp')
+                ]
+
+                if shp_files:
+                    shp_stem = os.path.splitext(shp_files[0])[0]
+                    members = [name for name in names if os.path.splitext(name)[0] == shp_stem]
+                    os.makedirs(temp_dir, exist_ok=True)
+                    file_manager.extract_zip_members(zf, members, temp_dir)
         except Exception as e:
             os.remove(zip_path)
             raise ValueError(f"Error unzipping shapefile: {e}") from e
@@ -127,17 +150,15 @@ class LayerManager:
         except Exception as e:
             raise ValueError(f"Failed to delete the zip file after extraction: {e}") from e
 
-        # 3. Locate the .shp file
-        shp_files = [f for f in os.listdir(temp_dir) if f.lower().endswith('.shp')]
+        # 3. Reject archives without a shapefile (nothing was extracted)
         if not shp_files:
-            shutil.rmtree(temp_dir)
             raise ValueError("No .shp file found inside the ZIP.")
 
         shp_path = os.path.join(temp_dir, shp_files[0])
 
         # 4. Read shapefile with GeoPandas
         try:
-            gdf = gpd.read_file(shp_path)
+            gdf = gpd.read_file(shp_path, engine=VECTOR_IO_ENGINE)
         except Exception as e:
             shutil.rmtree(temp_dir)
             raise ValueError(f"Error reading shapefile with GeoPandas: {e}") from e
@@ -167,7 +188,8 @@ class LayerManager:
             gdf.to_file(
                 new_gpkg_path,
                 layer=layer_name,
-                driver="GPKG"
+                driver="GPKG",
+                engine=VECTOR_IO_ENGINE
             )
 
             # 10. Cleanup extracted files
@@ -197,7 +219,7 @@ class LayerManager:
 
         try:
             # Read source layer
-            gdf = gpd.read_file(geojson_path)  # can specify layer= if from a GeoPackage
+            gdf = gpd.read_file(geojson_path, engine=VECTOR_IO_ENGINE)  # can specify layer= if from a GeoPackage
 
             # Check CRS
             if gdf.crs is None:
@@ -217,7 +239,8 @@ class LayerManager:
             gdf.to_file(
                 new_gpkg_path,
                 layer=layer_name,
-                driver="GPKG"
+                driver="GPKG",
+                engine=VECTOR_IO_ENGINE
             )
 
             os.remove(geojson_path)
@@ -292,94 +315,63 @@ class LayerManager:
         all_metadata = []
         all_gpkg_ids = []
 
-        # Import each layer
-        for layer_name in incoming_layers:
-            try:
-                gdf = gpd.read_file(geopackage_path, layer=layer_name)
-
-                # Normalize CRS
-                if gdf.crs is None:
-                    raise ValueError(f"Layer '{layer_name}' has no CRS.")
-
-                original_crs = gdf.crs.to_string()
-                if original_crs != target_crs:
-                    gdf = gdf.to_crs(target_crs)
-
-                # Create unique gpkg ids
-                new_gpkg_id = str(uuid.uuid4())
-                new_gpkg_path = os.path.join(file_manager.temp_dir, f"{new_gpkg_id}.gpkg")
-
-                # Write to default GeoPackage
-                gdf.to_file(
-                    new_gpkg_path,
-                    layer=layer_name,
-                    driver="GPKG"
-                )
+        try:
+            # Layers are independent (separate reads and output files), so import them concurrently
+            if incoming_layers:
+                max_workers = min(self.MAX_IMPORT_WORKERS, len(incoming_layers))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = [
+                        executor.submit(self.__import_gpkg_layer, geopackage_path, layer_name, target_crs)
+                        for layer_name in incoming_layers
+                    ]
+
+                # Every import has finished here; results are collected in input order
+                failure = None
+                for future in futures:
+                    try:
+                        new_gpkg_id, metadata = future.result()
+                    except Exception as e:
+                        failure = failure or e
+                        continue
 
-                metadata = self.__get_gpkg_metadata(new_gpkg_path, original_crs)
-                self.__move_to_permanent(new_gpkg_path, new_gpkg_id, metadata)
-                all_gpkg_ids.append(new_gpkg_id)
-                all_metadata.append(metadata)
-            except Exception as e:
-                raise ValueError(f"Failed to import layer '{layer_name}': {e}") from e
+                    all_gpkg_ids.append(new_gpkg_id)
+                    all_metadata.append(metadata)
 
-        os.remove(geopackage_path)
+                # The import is all or nothing: drop the layers that were stored before
+                # raising the first failure, so none of them is left without an owner
+                if failure is not None:
+                    for new_gpkg_id in all_gpkg_ids:
+                        self.__discard_layer(new_gpkg_id)
+                    raise failure
+        finally:
+            try:
+                os.remove(geopackage_path)
+            except FileNotFoundError:
+                pass
 
         return all_gpkg_ids, all_metadata
 
-    def export_geopackage_layer_to_geojson(self, layer_id):
+    def stream_geopackage_layer_as_geojson(self, layer_id):
         """
-        Extract a layer from a GeoPackage and save it as a GeoJSON file.
+        Stream a GeoPackage layer as a GeoJSON FeatureCollection without a temporary file.
 
         :param layer_id: The id of the GeoPackage.
-        :return: Path to the exported GeoJSON file.
-        :raises ValueError: If GeoPackage has no layers or conversion fails.
+        :return: Generator yielding the GeoJSON document as byte chunks.
+        :raises ValueError: If GeoPackage has no layers or cannot be read.
         """
-        export_dir = os.path.join(file_manager.temp_dir, "export")
-
-        # Ensure export directory exists
-        os.makedirs(export_dir, exist_ok=True)
-
-        # Clean export directory (delete existing files)
-        for filename in os.listdir(export_dir):
-            file_path = os.path.join(export_dir, filename)
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-            elif os.path.isdir(file_path):
-                shutil.rmtree(file_path)
-
-        geojson_path = os.path.join(export_dir, f"{layer_id}.geojson")
 
         gpkg_path = os.path.join(file_manager.layers_dir, f"{layer_id}.gpkg")
 
-        # Open the layer in the GeoPackage
+        # Fail before streaming starts, while an error response can still be sent
         try:
-            layers = fiona.listlayers(gpkg_path)
-            if not layers:
-                raise ValueError("No layers found in the GeoPackage.")
-
-            layer_name = layers[0]
-
-            # Open the only layer
-            with fiona.open(gpkg_path, layer=layer_name) as src:
-                src_crs = src.crs
-                schema = src.schema
-
-                # Create GeoJSON file
-                with fiona.open(
-                    geojson_path,
-                    mode="w",
-                    driver="GeoJSON",
-                    crs=src_crs,
-                    schema=schema
-                ) as dst:
-                    for feature in src:
-                        dst.write(feature)
-
+            layers = pyogrio.list_layers(gpkg_path)
         except Exception as e:
             raise ValueError(f"Failed to convert GeoPackage to GeoJSON: {e}") from e
 
-        return geojson_path
+        if len(layers) == 0:
+            raise ValueError("No layers found in the GeoPackage.")
+
+        return self.__generate_geojson_chunks(gpkg_path, layers[0][0])
 
     def export_raster_layer(self, layer_name):
         """
@@ -434,7 +426,30 @@ class LayerManager:
         gpkg_path = os.path.join(layers_dir, layer_id + ".gpkg")
 
         raster_path = self.is_raster(layer_id)
-        raster_path = self.is_raster(layer_id)
+
+        # Reuse the last result while the layer file is unchanged on disk
+        stamp = self.__file_stamp(raster_path or gpkg_path)
+        cached = self.__layer_information_cache.get(layer_id)
+        if stamp is not None and cached is not None and cached[0] == stamp:
+            return dict(cached[1])
+
+        info = self.__read_layer_information(layer_id, raster_path, gpkg_path)
+        if stamp is not None:
+            self.__layer_information_cache[layer_id] = (stamp, info)
+
+        return dict(info)
+
+    def __read_layer_information(self, layer_id, raster_path, gpkg_path):
+        """
+        Read layer metadata from the raster or GeoPackage file.
+
+        :param layer_id: The unique name/identifier of the layer.
+        :param raster_path: Path of the raster file, or None for vector layers.
+        :param gpkg_path: Path of the layer's GeoPackage.
+        :return: Dictionary containing layer metadata.
+        :raises ValueError: If the layer is not found or GeoPackage is unreadable.
+        """
+
         if raster_path:
             with rasterio.open(raster_path) as src:
                 return {
@@ -449,9 +464,8 @@ class LayerManager:
         # Check if the layer_id matches a vector layer in the GeoPackage
         if os.path.isfile(gpkg_path):
             try:
-                layers = fiona.listlayers(gpkg_path)
-                candidate = layers[0]
-                gdf = gpd.read_file(gpkg_path, layer=candidate)
+                candidate = pyogrio.list_layers(gpkg_path)[0][0]
+                gdf = gpd.read_file(gpkg_path, layer=candidate, engine=VECTOR_IO_ENGINE)
                 return {
                         "type": "vector",
                         "geometry_type": gdf.geom_type.mode()[0] if not gdf.empty else None,
@@ -485,6 +499,29 @@ class LayerManager:
 
         return None
 
+    def get_layer_paths(self, layer_ids):
+        """
+        Get the file paths for several layers with a single directory listing.
+
+        Resolution order per layer matches get_layer_path (raster first, then GeoPackage).
+
+        :param layer_ids: Iterable of layer identifiers.
+        :return: Dictionary mapping each layer_id to its file path, or None if not found.
+        """
+
+        with os.scandir(file_manager.layers_dir) as entries:
+            existing = {entry.name for entry in entries if entry.is_file()}
+
+        layer_paths = {}
+        for layer_id in layer_ids:
+            layer_paths[layer_id] = None
+            for ext in (".tif", ".tiff", ".TIF", ".TIFF", ".gpkg"):
+                if f"{layer_id}{ext}" in existing:
+                    layer_paths[layer_id] = os.path.join(file_manager.layers_dir, f"{layer_id}{ext}")
+                    break
+
+        return layer_paths
+
     def get_layer_extension(self, layer_id):
         """
         Return the file extension for a given layer ID.
@@ -657,6 +694,21 @@ class LayerManager:
         return layer_ids, metadata_list
 
 
+    @staticmethod
+    def __file_stamp(path):
+        """
+        Identify the current version of a file on disk.
+
+        :param path: Path of the file.
+        :return: Tuple (mtime_ns, size), or None if the file cannot be stat'ed.
+        """
+
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+        return (stat_result.st_mtime_ns, stat_result.st_size)
+
     @staticmethod
     def __check_raster_system_coordinates(raster_path):
         """
@@ -689,22 +741,185 @@ class LayerManager:
         :raises ValueError: If conversion fails.
         """
 
-        temp_path = "very_complex_raster_name_temp.tiff"
-        shutil.copy(raster_path, temp_path)
+        # Reproject from the original into a sibling file, then swap it in with an
+        # atomic rename; the source never has to be duplicated up front
+        base_dir, file_name = os.path.split(raster_path)
+        converted_path = os.path.join(base_dir, f".{uuid.uuid4()}_{file_name}")
         try:
-            with rioxarray.open_rasterio(temp_path) as raster:
-                # Convert to target CRS
-                raster_converted = raster.rio.reproject(target_crs)
+            # GDAL warps the VRT block by block while copying, so the raster is
+            # never loaded into memory as a whole
+            with rasterio.open(raster_path) as src:
+                # Pixels outside the source footprint must come out as nodata,
+                # not as valid zeros
+                nodata = src.nodata
+                if nodata is None:
+                    nodata = LayerManager.__default_raster_nodata(src.dtypes[0])
 
-                # Save the converted file back to the same path
-                raster_converted.rio.to_raster(raster_path)
+                with WarpedVRT(src, crs=target_crs, resampling=Resampling.nearest, nodata=nodata) as vrt:
+                    rio_copy(vrt, converted_path, driver="GTiff")
 
-            os.remove(temp_path)
+            # Replace the original with the converted raster
+            os.replace(converted_path, raster_path)
 
             return raster_path
         except Exception as e:
+            try:
+                os.remove(converted_path)
+            except FileNotFoundError:
+                pass
             raise ValueError(f"Error converting tif CRS: {e}") from e
 
+    @staticmethod
+    def __default_raster_nodata(dtype):
+        """
+        Pick a nodata value for a raster band that does not declare one.
+
+        :param dtype: Band data type.
+        :return: NaN for floating point bands, otherwise the largest value of an
+                 unsigned type or the smallest value of a signed type.
+        """
+
+        dtype = np.dtype(dtype)
+        if np.issubdtype(dtype, np.floating):
+            return float("nan")
+        if np.issubdtype(dtype, np.unsignedinteger):
+            return int(np.iinfo(dtype).max)
+        return int(np.iinfo(dtype).min)
+
+    @staticmethod
+    def __discard_layer(layer_id):
+        """
+        Remove a stored GeoPackage layer and its metadata file.
+
+        :param layer_id: Id of the layer to remove. Missing files are ignored.
+        """
+
+        for file_name in (f"{layer_id}.gpkg", f"{layer_id}_metadata.json"):
+            try:
+                os.remove(os.path.join(file_manager.layers_dir, file_name))
+            except FileNotFoundError:
+                pass
+
+    def __import_gpkg_layer(self, geopackage_path, layer_name, target_crs):
+        """
+        Import a single layer of an external GeoPackage into permanent storage.
+
+        :param geopackage_path: Path to the incoming .gpkg file.
+        :param layer_name: Name of the layer to import.
+        :param target_crs: CRS to convert the layer to.
+        :return: Tuple of (new_gpkg_id, metadata).
+        :raises ValueError: If the layer has no CRS or cannot be imported.
+        """
+
+        try:
+            gdf = gpd.read_file(geopackage_path, layer=layer_name, engine=VECTOR_IO_ENGINE)
+
+            # Normalize CRS
+            if gdf.crs is None:
+                raise ValueError(f"Layer '{layer_name}' has no CRS.")
+
+            original_crs = gdf.crs.to_string()
+            if original_crs != target_crs:
+                gdf = gdf.to_crs(target_crs)
+
+            # Create unique gpkg ids
+            new_gpkg_id = str(uuid.uuid4())
+            new_gpkg_path = os.path.join(file_manager.temp_dir, f"{new_gpkg_id}.gpkg")
+
+            # Write to default GeoPackage
+            gdf.to_file(
+                new_gpkg_path,
+                layer=layer_name,
+                driver="GPKG",
+                engine=VECTOR_IO_ENGINE
+            )
+
+            metadata = self.__get_gpkg_metadata(new_gpkg_path, original_crs)
+            self.__move_to_permanent(new_gpkg_path, new_gpkg_id, metadata)
+        except Exception as e:
+            raise ValueError(f"Failed to import layer '{layer_name}': {e}") from e
+
+        return new_gpkg_id, metadata
+
+    @staticmethod
+    def __encode_geojson_features(gdf):
+        """
+        Encode the rows of a GeoDataFrame as GeoJSON Feature objects.
+
+        Geometries are converted in one vectorized shapely call and properties
+        are serialized with orjson. The index (the feature ids) becomes each
+        feature's "id", as a string like fiona reports it.
+
+        :param gdf: GeoDataFrame to encode.
+        :return: List of encoded features (bytes), in row order.
+        """
+
+        geometries = shapely.to_geojson(gdf.geometry.values)
+        records = gdf.drop(columns=gdf.geometry.name).to_dict("records")
+
+        return [
+            b'{"type":"Feature","id":'
+            + orjson.dumps(str(feature_id))
+            + b',"properties":'
+            + orjson.dumps(
+                properties,
+                default=LayerManager.__json_default,
+                option=orjson.OPT_SERIALIZE_NUMPY
+            )
+            + b',"geometry":'
+            + (geometry.encode() if geometry is not None else b"null")
+            + b"}"
+            for feature_id, properties, geometry in zip(gdf.index, records, geometries)
+        ]
+
+    @staticmethod
+    def __json_default(value):
+        """
+        Serialize values orjson does not handle natively (e.g. pandas Timestamp/NaT).
+
+        :param value: Value to serialize.
+        :return: ISO 8601 string, or None for missing timestamps.
+        :raises TypeError: If the value cannot be serialized.
+        """
+
+        if hasattr(value, "isoformat"):
+            # NaT is the only timestamp not equal to itself
+            return value.isoformat() if value == value else None
+        raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+    @staticmethod
+    def __generate_geojson_chunks(gpkg_path, layer_name, batch_size=1000):
+        """
+        Serialize a GeoPackage layer to GeoJSON, yielding batches of features.
+
+        :param gpkg_path: Path to the GeoPackage file.
+        :param layer_name: Name of the layer to serialize.
+        :param batch_size: Number of features per yielded chunk.
+        :return: Generator of byte chunks forming one FeatureCollection.
+        """
+
+        feature_count = pyogrio.read_info(gpkg_path, layer=layer_name, force_feature_count=True)["features"]
+
+        yield b'{"type":"FeatureCollection","features":['
+
+        # Each batch is read as one GeoDataFrame and encoded with vectorized
+        # geometry conversion, instead of building a Python dict per feature
+        separator = b""
+        for offset in range(0, feature_count, batch_size):
+            gdf = pyogrio.read_dataframe(
+                gpkg_path,
+                layer=layer_name,
+                skip_features=offset,
+                max_features=batch_size,
+                fid_as_index=True
+            )
+            features = LayerManager.__encode_geojson_features(gdf)
+            if features:
+                yield separator + b",".join(features)
+                separator = b","
+
+        yield b"]}"
+
     @staticmethod
     def __retrieve_spatial_layers_from_incoming_gpkg(new_geopackage_path):
         """
@@ -715,30 +930,20 @@ class LayerManager:
         :raises ValueError: If GeoPackage is invalid or contains no spatial layers.
         """
 
+        # One dataset open lists every layer together with its geometry type
         try:
-            all_layers = fiona.listlayers(new_geopackage_path)
+            all_layers = pyogrio.list_layers(new_geopackage_path)
         except Exception as e:
             raise ValueError(f"Invalid GeoPackage: {e}") from e
 
-        if not all_layers:
+        if len(all_layers) == 0:
             raise ValueError("GeoPackage contains no layers.")
 
-        # 2. Filter only real spatial layers
-        incoming_layers = []
-
-        for layer in all_layers:
-            try:
-                with fiona.open(new_geopackage_path, layer=layer) as src:
-                    geom = src.schema.get("geometry")
-                    if geom in [None, "", "None"]:
-                        # This is NOT a real vector layer → skip
-                        continue
-                    incoming_layers.append(layer)
-            except FionaValueError:
-                # Not a readable vector layer
-                continue
-            except (OSError, IOError):
-                continue
+        # 2. Filter only real spatial layers (attribute tables have no geometry type)
+        incoming_layers = [
+            layer for layer, geometry_type in all_layers
+            if geometry_type not in (None, "", "None")
+        ]
 
         if not incoming_layers:
             raise ValueError("No valid spatial layers found in GeoPackage.")
@@ -757,11 +962,11 @@ class LayerManager:
         """
 
         try:
-            layers = fiona.listlayers(gpkg_path)
+            layer_name = pyogrio.list_layers(gpkg_path)[0][0]
 
-            gdf = gpd.read_file(gpkg_path, layer=layers[0])
+            gdf = gpd.read_file(gpkg_path, layer=layer_name, engine=VECTOR_IO_ENGINE)
             return {
-                "layer_name": layers[0],    
+                "layer_name": layer_name,
                 "type": "vector",
                 "geometry_type": gdf.geom_type.mode()[0] if not gdf.empty else None,
                 "crs": gdf.crs.to_string() if gdf.crs else None,
@@ -9,10 +9,14 @@ layer registration, logging, and metadata management.
 import ast
 import json
 import os
-import shutil
 import subprocess
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
+import orjson
 from werkzeug.exceptions import BadRequest, NotFound
 
 from .FileManager import FileManager
@@ -21,6 +25,27 @@ from .LayerManager import LayerManager
 file_manager = FileManager()
 layer_manager = LayerManager()
 
+# Parsed metadata shared by every ScriptManager instance, keyed by metadata path.
+# Each entry stores the (st_mtime_ns, st_size) of the snapshot and journal files it
+# was read from, so they are only parsed again when they actually changed on disk.
+_metadata_cache = {}
+
+# Serialises metadata changes, journal appends and snapshot compaction across the
+# server's request threads. Re-entrant because an append may trigger a compaction.
+_metadata_lock = threading.RLock()
+
+# Script versions that already passed _validate_script_integrity, keyed by
+# (path, st_mtime_ns, st_size). Least recently used entries are evicted first.
+_validated_scripts = OrderedDict()
+# Guards _validated_scripts lookups, inserts and evictions across request threads.
+# Validation itself runs outside of it.
+_validated_scripts_lock = threading.Lock()
+
+# Shared decoder for metadata form values (skips json.loads' per-call dispatch)
+_json_decoder = json.JSONDecoder()
+# Characters a JSON document can start with (NaN/Infinity and leading whitespace included)
+_JSON_START_CHARS = frozenset('{["-0123456789tfnNI \t\n\r')
+
 class ScriptManager:
     """
     Manages user-provided Python scripts and their execution lifecycle.
@@ -31,6 +56,8 @@ class ScriptManager:
     """
 
     MAX_SCRIPT_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+    JOURNAL_COMPACTION_RATIO = 2  # Rewrite the snapshot once the journal outgrows it
+    MAX_VALIDATED_SCRIPTS = 128  # Entries kept in the validation cache
     ALLOWED_MIME_TYPES = {"text/x-python", "application/octet-stream", "text/x-python-script"}
 
     def __init__(self, scripts_metadata='scripts_metadata.json'):
@@ -45,8 +72,9 @@ class ScriptManager:
         if not os.path.isdir(file_manager.scripts_dir):
             raise FileNotFoundError(f"Script directory does not exist: {file_manager.scripts_dir}")
 
-        # Build the full file path
+        # Build the full file paths (snapshot + append-only NDJSON journal of changes)
         self.metadata_path = os.path.join(file_manager.scripts_dir, scripts_metadata)
+        self.journal_path = f"{os.path.splitext(self.metadata_path)[0]}.ndjson"
 
         # If file does not exist, create it
         if not os.path.isfile(self.metadata_path):
@@ -54,9 +82,12 @@ class ScriptManager:
             with open(self.metadata_path, 'w', encoding="utf-8") as f:
                 json.dump(initial_structure, f, indent=4)
 
-        # Load metadata
-        with open(self.metadata_path, 'r', encoding="utf-8") as f:
-            self.metadata = json.load(f)
+        # Load metadata (served from the shared cache when the files are unchanged)
+        self.load_metadata()
+
+        # Fold journaled changes into a fresh snapshot on startup
+        if os.path.isfile(self.journal_path):
+            self.save_metadata()
 
         self._validate_script_files()
 
@@ -80,19 +111,16 @@ class ScriptManager:
         :param metadata_form: Dictionary of metadata fields to store.
         """
 
-        parsed_metadata = {}
-
-        for key, value in metadata_form.items():
-            try:
-                parsed_metadata[key] = json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                parsed_metadata[key] = value
+        parsed_metadata = {
+            key: self._parse_form_value(value) for key, value in metadata_form.items()
+        }
 
-        if "scripts" not in self.metadata:
-            self.metadata["scripts"] = {}
+        with _metadata_lock:
+            if "scripts" not in self.metadata:
+                self.metadata["scripts"] = {}
 
-        self.metadata["scripts"][script_id] = parsed_metadata
-        self.save_metadata()
+            self.metadata["scripts"][script_id] = parsed_metadata
+            self._append_to_journal({"op": "add", "id": script_id, "metadata": parsed_metadata})
 
     def run_script(self, script_path, script_id, execution_id, data):
         """
@@ -101,6 +129,9 @@ class ScriptManager:
         Creates an isolated execution environment with standardized folder structure,
         validates script integrity, prepares input parameters, executes the script as
         a subprocess, processes outputs, and captures execution logs.
+
+        Validation results are cached per script version, so unchanged scripts are
+        not re-parsed on every run. Each run executes its own copy of the script.
         
         Execution Environment Structure:
             /temporary/scripts/{execution_id}/
@@ -132,24 +163,16 @@ class ScriptManager:
 
         # -------- EXECUTION_ID FOLDERS/FILES SETUP --------
 
-        # Creating the execution_id folder within /temporary/scripts
-        execution_folder = os.path.join(file_manager.execution_dir, str(execution_id))
-        os.makedirs(execution_folder, exist_ok=True)
-
-        # Copying script onto execution_folder
-        script_copy_path = os.path.join(execution_folder, f"{script_id}.py")
-        shutil.copy(script_path, script_copy_path)
+        # Creating the execution_id folder within /temporary/scripts with its inputs/outputs
+        execution_folder, inputs_folder, outputs_folder = self._make_exec_layout(execution_id)
 
         # Check for syntax errors, "main" function declaration and its call through __main__
-        self._validate_script_integrity(script_copy_path)
+        self._ensure_script_validated(script_path)
 
-        # Creating the inputs folder
-        inputs_folder = os.path.join(execution_folder, "inputs")
-        os.makedirs(inputs_folder, exist_ok=True)
-
-        # Creating the outputs folder
-        outputs_folder = os.path.join(execution_folder, "outputs")
-        os.makedirs(outputs_folder, exist_ok=True)
+        # Copying script onto execution_folder, so the run never touches the stored script.
+        # clone_file shares extents (reflink) or copies in-kernel where it can.
+        script_copy_path = os.path.join(execution_folder, f"{script_id}.py")
+        file_manager.clone_file(script_path, script_copy_path)
 
         # Creating the log file
         log_path = os.path.join(execution_folder, f"log_{script_id}.txt")
@@ -162,40 +185,44 @@ class ScriptManager:
         status = None
 
         # Execute the script as a subprocess. It will save outputs to the appropriate folder.
-        try:
-            script_copy_path_abs = os.path.abspath(script_copy_path)
-            outputs_folder_abs = os.path.abspath(outputs_folder)
-            data_str = json.dumps(new_data)
-
-            result = subprocess.run(
-                ["python", script_copy_path_abs, outputs_folder_abs, data_str],
-                cwd=execution_folder,
-                capture_output=True,
-                text=True,
-                timeout=600,
-                check=True
-            )
-            status = "success"
-        except subprocess.TimeoutExpired:
-            status = "timeout"
-            result = None  # optional
-        except subprocess.CalledProcessError as e:
-            if e.returncode == 15:
-                status = "terminated"
-            else:    
-                status = "failure"
-            result = e  # contains stdout/stderr
-
-
-        # ----- LOGGING AND OUTPUT HANDLING -----
-
-        # Write all prints and errors that occured during execution to the log file
-        with open(log_path, "w", encoding="utf-8") as f:
+        # stdout is streamed straight into the log file instead of being buffered in memory;
+        # stderr is captured and appended to the log once the script has finished.
+        script_copy_path_abs = os.path.abspath(script_copy_path)
+        outputs_folder_abs = os.path.abspath(outputs_folder)
+        data_str = json.dumps(new_data)
+
+        with open(log_path, "w", encoding="utf-8") as log_file:
+            try:
+                result = subprocess.run(
+                    [sys.executable, script_copy_path_abs, outputs_folder_abs, data_str],
+                    cwd=execution_folder,
+                    stdout=log_file,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    timeout=600,
+                    check=True
+                )
+                status = "success"
+            except subprocess.TimeoutExpired:
+                status = "timeout"
+                result = None  # optional
+            except subprocess.CalledProcessError as e:
+                if e.returncode == 15:
+                    status = "terminated"
+                else:    
+                    status = "failure"
+                result = e  # contains stderr
+
+            # ----- LOGGING AND OUTPUT HANDLING -----
+
+            # Everything up to here in the log is the script's stdout
+            stdout_size = os.fstat(log_file.fileno()).st_size
+
+            # Append the errors that occured during execution to the log file
             if result is not None:
-                f.write(result.stdout)
-                f.write(result.stderr)
+                log_file.write(result.stderr or "")
             else:
-                f.write("Script Timeout.")
+                log_file.write("Script Timeout.")
 
         # ---- Handle outputs ----
         result_value = None
@@ -221,7 +248,8 @@ class ScriptManager:
 
         # If no files, fallback to stdout (simple value)
         if not output_ids and result is not None:
-            stdout_value = result.stdout.strip()
+            with open(log_path, "rb") as log_file:
+                stdout_value = log_file.read(stdout_size).decode("utf-8", errors="replace").strip()
             if stdout_value:
                 result_value = stdout_value
 
@@ -243,20 +271,65 @@ class ScriptManager:
         """
         Load metadata from disk.
 
+        Reads the snapshot and replays the journal on top of it. The result is
+        cached per metadata path and only re-read when either file changes.
+
         :return: Dictionary containing all script metadata.
         """
 
-        with open(self.metadata_path, 'r', encoding="utf-8") as f:
-            self.metadata = json.load(f)
-        return self.metadata
+        with _metadata_lock:
+            signature = self._files_signature()
+
+            cached = _metadata_cache.get(self.metadata_path)
+            if cached is None or cached[0] != signature:
+                with open(self.metadata_path, 'rb') as f:
+                    metadata = orjson.loads(f.read())
+                self._replay_journal(metadata)
+
+                cached = (signature, metadata)
+                _metadata_cache[self.metadata_path] = cached
+
+            self.metadata = cached[1]
+            return self.metadata
 
     def save_metadata(self):
         """
-        Persist metadata to disk.
+        Persist a full metadata snapshot to disk and truncate the journal.
+
+        Compact JSON is written and fsynced to a uniquely named temporary file in
+        the same directory which then atomically replaces the metadata file, and
+        the shared cache is refreshed.
         """
 
-        with open(self.metadata_path, 'w', encoding="utf-8") as f:
-            json.dump(self.metadata, f, indent=4)
+        with _metadata_lock:
+            fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self.metadata_path),
+                prefix=f".{os.path.basename(self.metadata_path)}.",
+                suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(orjson.dumps(self.metadata))
+                    # mkstemp creates the file owner-only; keep the usual metadata permissions
+                    os.fchmod(f.fileno(), 0o644)
+                    # Make sure the data is on disk before the rename makes it visible
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.metadata_path)
+            except BaseException:
+                try:
+                    os.remove(temp_path)
+                except FileNotFoundError:
+                    pass
+                raise
+
+            # Every journaled change is now part of the snapshot
+            try:
+                os.remove(self.journal_path)
+            except FileNotFoundError:
+                pass
+
+            _metadata_cache[self.metadata_path] = (self._files_signature(), self.metadata)
 
 
     def get_metadata(self, script_id):
@@ -278,9 +351,10 @@ class ScriptManager:
         """
 
         try:
-            if script_id in self.metadata.get("scripts", {}):
-                del self.metadata["scripts"][script_id]
-                self.save_metadata()
+            with _metadata_lock:
+                if script_id in self.metadata.get("scripts", {}):
+                    del self.metadata["scripts"][script_id]
+                    self._append_to_journal({"op": "delete", "id": script_id})
 
             os.remove(os.path.join(file_manager.scripts_dir, f"{script_id}.py"))
         except Exception as e:
@@ -296,19 +370,109 @@ class ScriptManager:
         """
 
         scripts = self.metadata.get("scripts", {})
-        removed_scripts = []
+        if not scripts:
+            return
+
+        # A single directory listing instead of one stat call per registered script
+        with os.scandir(file_manager.scripts_dir) as entries:
+            existing = {
+                entry.name[:-3] for entry in entries
+                if entry.name.endswith(".py") and entry.is_file()
+            }
+
+        with _metadata_lock:
+            removed_scripts = [script_id for script_id in scripts if script_id not in existing]
+            for script_id in removed_scripts:
+                del scripts[script_id]
+
+            # Save updated metadata if any scripts were removed
+            if removed_scripts:
+                self.save_metadata()
+                print(f"Removed missing scripts from metadata: {', '.join(removed_scripts)}")
 
-        # Iterate over a copy of keys to avoid runtime error while deleting
-        for script_id in list(scripts.keys()):
-            script_file = os.path.join(file_manager.scripts_dir, f"{script_id}.py")
-            if not os.path.isfile(script_file):
-                removed_scripts.append(script_id)
-                del self.metadata["scripts"][script_id]
+    @staticmethod
+    def _parse_form_value(value):
+        """
+        Decode a metadata form value as JSON, keeping it unchanged if it isn't JSON.
 
-        # Save updated metadata if any scripts were removed
-        if removed_scripts:
-            self.save_metadata()
-            print(f"Removed missing scripts from metadata: {', '.join(removed_scripts)}")
+        :param value: Raw form value (usually a string).
+        :return: The decoded JSON value, or the original value.
+        """
+
+        # Plain text can't be JSON; skip the decoder and its exception path
+        if not isinstance(value, str) or not value or value[0] not in _JSON_START_CHARS:
+            return value
+
+        try:
+            return _json_decoder.decode(value)
+        except json.JSONDecodeError:
+            return value
+
+    def _append_to_journal(self, operation):
+        """
+        Record a single metadata change as one line of the NDJSON journal.
+
+        The snapshot is rewritten once the journal grows past
+        JOURNAL_COMPACTION_RATIO times the snapshot size, or when it is missing.
+
+        :param operation: Dictionary with an 'op' ('add' or 'delete') and the script 'id'.
+        """
+
+        line = orjson.dumps(operation) + b"\n"
+        with _metadata_lock:
+            with open(self.journal_path, 'ab') as f:
+                f.write(line)
+
+            signature = self._files_signature()
+            _metadata_cache[self.metadata_path] = (signature, self.metadata)
+
+            # Without a snapshot there is nothing to replay the journal onto, so compact now
+            snapshot_signature, journal_signature = signature
+            if snapshot_signature is None or \
+                    journal_signature[1] > self.JOURNAL_COMPACTION_RATIO * snapshot_signature[1]:
+                self.save_metadata()
+
+    def _replay_journal(self, metadata):
+        """
+        Apply every journaled change on top of a loaded snapshot.
+
+        A truncated last line (e.g. after a crash mid-write) ends the replay.
+
+        :param metadata: Snapshot dictionary to update in place.
+        """
+
+        try:
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        operation = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        break
+
+                    scripts = metadata.setdefault("scripts", {})
+                    if operation.get("op") == "add":
+                        scripts[operation["id"]] = operation.get("metadata", {})
+                    elif operation.get("op") == "delete":
+                        scripts.pop(operation["id"], None)
+        except FileNotFoundError:
+            pass
+
+    def _files_signature(self):
+        """
+        Build the cache validator for the snapshot and journal files.
+
+        :return: Tuple of (st_mtime_ns, st_size) pairs, None for a missing file.
+        """
+
+        signature = []
+        for path in (self.metadata_path, self.journal_path):
+            try:
+                file_stat = os.stat(path)
+                signature.append((file_stat.st_mtime_ns, file_stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+
+        return tuple(signature)
 
     @staticmethod
     def __add_output_to_existing_layers(file_path):
@@ -320,13 +484,16 @@ class ScriptManager:
         :raises BadRequest: If file format is not supported or is a shapefile without .zip.
         """
 
+        # The layer ids come from the layer manager; the path without its extension
+        # is passed on as the layer name
         file_name, file_extension = os.path.splitext(file_path)
-        layer_id = os.path.basename(file_name)
 
         match file_extension.lower():
             case ".shp":
-                if os.path.exists(file_path):
+                try:
                     os.remove(file_path)
+                except FileNotFoundError:
+                    pass
                 raise BadRequest(
                     "Please upload shapefiles as a .zip containing all necessary"
                     "components (.shp, .shx, .dbf, optional .prj)."
@@ -345,8 +512,10 @@ class ScriptManager:
                 layer_id, metadata = layer_manager.add_gpkg_layers(file_path)
 
             case _:
-                if os.path.exists(file_path):
+                try:
                     os.remove(file_path)
+                except FileNotFoundError:
+                    pass
                 raise BadRequest("File extension not supported")
 
 
@@ -383,38 +552,40 @@ class ScriptManager:
         Prepare input parameters for script execution by copying layer files.
 
         :param data: Dictionary containing layers and other parameters.
-        :param execution_dir_input: Directory path where input files should be copied.
+        :param execution_dir_input: Existing directory (created by _make_exec_layout)
+                                    where input files should be copied.
         :return: Dictionary with updated layer paths pointing to copied files.
-        :raises BadRequest: If execution_dir_input doesn't exist.
         :raises NotFound: If a specified layer is not found.
         """
 
-        # Validate execution_dir_input exists
-        if not os.path.isdir(execution_dir_input):
-            raise BadRequest(
-                f"Couldn't locate folder to load input layers onto: {execution_dir_input}"
-            )
-
         layers = data.get("layers", [])
         layers_paths = []
+        # Layer copies already made for this run, so a layer passed twice is copied once
+        copied_layers = {}
+
+        # Resolve every requested layer with one directory listing
+        resolved_paths = layer_manager.get_layer_paths(layers) if layers else {}
 
         # Process each argument
-        for layer in layers:
-            layer = layer_manager.get_layer_path(layer)
+        for layer_id in layers:
+            layer = resolved_paths.get(layer_id)
 
             if layer is not None:
-                # Copy layer onto the execution_dir_input folder
-                layer_name = os.path.basename(layer)
-                layer_copy = os.path.join(execution_dir_input, layer_name)
-                layer_abs = os.path.abspath(layer)
-                layer_copy_abs = os.path.abspath(layer_copy)
-                shutil.copy(layer_abs, layer_copy_abs)
+                layer_copy_abs = copied_layers.get(layer)
+                if layer_copy_abs is None:
+                    # Copy layer onto the execution_dir_input folder (in-kernel, no user-space buffer)
+                    layer_name = os.path.basename(layer)
+                    layer_copy = os.path.join(execution_dir_input, layer_name)
+                    layer_abs = os.path.abspath(layer)
+                    layer_copy_abs = os.path.abspath(layer_copy)
+                    file_manager.clone_file(layer_abs, layer_copy_abs)
+                    copied_layers[layer] = layer_copy_abs
 
                 # Append layer_copy path if found
                 layers_paths.append(layer_copy_abs)
             else:
                 # Append original value if not a layer
-                raise NotFound(f"Layer not found: {layer}"  )
+                raise NotFound(f"Layer not found: {layer_id}")
 
         data["layers"] = layers_paths
         return data
@@ -428,8 +599,55 @@ class ScriptManager:
         """
 
         for layer in layers:
-            if os.path.isfile(layer):
+            # Unlink directly; a stat first would cost a syscall and still race the removal
+            try:
                 os.remove(layer)
+            except (FileNotFoundError, IsADirectoryError):
+                pass
+
+    @staticmethod
+    def _make_exec_layout(execution_id):
+        """
+        Create the folder layout for a script execution.
+
+        The execution folder itself is created implicitly as the parent of the
+        inputs and outputs folders.
+
+        :param execution_id: Unique identifier for this execution instance.
+        :return: Tuple of (execution_folder, inputs_folder, outputs_folder) paths.
+        """
+
+        execution_folder = os.path.join(file_manager.execution_dir, str(execution_id))
+        inputs_folder = os.path.join(execution_folder, "inputs")
+        outputs_folder = os.path.join(execution_folder, "outputs")
+
+        os.makedirs(inputs_folder, exist_ok=True)
+        os.makedirs(outputs_folder, exist_ok=True)
+
+        return execution_folder, inputs_folder, outputs_folder
+
+    def _ensure_script_validated(self, script_path):
+        """
+        Validate a script unless this exact version of it already passed validation.
+
+        :param script_path: Absolute path to the Python script to validate.
+        :raises BadRequest: If the script fails _validate_script_integrity.
+        """
+
+        file_stat = os.stat(script_path)
+        cache_key = (script_path, file_stat.st_mtime_ns, file_stat.st_size)
+
+        with _validated_scripts_lock:
+            if cache_key in _validated_scripts:
+                _validated_scripts.move_to_end(cache_key)
+                return
+
+        self._validate_script_integrity(script_path)
+
+        with _validated_scripts_lock:
+            _validated_scripts[cache_key] = True
+            while len(_validated_scripts) > self.MAX_VALIDATED_SCRIPTS:
+                _validated_scripts.popitem(last=False)
 
     @staticmethod
     def _validate_script_integrity(script_path):
@@ -444,29 +662,27 @@ class ScriptManager:
                            called under __main__ guard.
         """
 
-        # Syntax check
-        result = subprocess.run(
-            ["python", "-m", "py_compile", script_path],
-            capture_output=True,
-            text=True
-        )
-        if result.returncode != 0:
-            raise BadRequest(result.stderr)
-
-        # Check for main() definition
+        # Syntax check: parse once and compile the same tree to catch compile-time errors
         with open(script_path, "r", encoding="utf-8") as f:
-            tree = ast.parse(f.read(), filename=script_path)
+            source = f.read()
 
-        if not any(
-            isinstance(node, ast.FunctionDef) and node.name == "main"
-            for node in ast.walk(tree)
-        ):
-            raise BadRequest("Script must define a function named 'main(params)'")
-
-        # Check for main() call under __main__ guard
+        try:
+            tree = ast.parse(source, filename=script_path)
+            compile(tree, script_path, "exec")
+        # Deeply nested sources exhaust the parser's recursion limit or memory
+        # instead of raising SyntaxError; they are just as invalid
+        except (SyntaxError, ValueError, RecursionError, MemoryError) as e:
+            raise BadRequest(f"{type(e).__name__}: {e}") from e
+
+        # Single pass over the tree: look for the main() definition and for a
+        # main() call under the __main__ guard at the same time
+        main_defined = False
         main_called = False
         for node in ast.walk(tree):
-            if isinstance(node, ast.If):
+            if isinstance(node, ast.FunctionDef):
+                if node.name == "main":
+                    main_defined = True
+            elif isinstance(node, ast.If) and not main_called:
                 test = node.test
                 # Detect if __name__ == "__main__"
                 if (isinstance(test, ast.Compare) and
@@ -475,9 +691,12 @@ class ScriptManager:
                     isinstance(test.comparators[0], ast.Constant) and
                     test.comparators[0].value == "__main__"):
                     # Check if main() is called inside this block
-                    for child in ast.walk(node):
-                        if isinstance(child, ast.Call) and getattr(child.func, "id", None) == "main":
-                            main_called = True
-                            break
+                    main_called = any(
+                        isinstance(child, ast.Call) and getattr(child.func, "id", None) == "main"
+                        for child in ast.walk(node)
+                    )
+
+        if not main_defined:
+            raise BadRequest("Script must define a function named 'main(params)'")
         if not main_called:
             raise BadRequest("'main(params)' function is not called under '__main__' guard")
@@ -67,17 +67,20 @@ import os
 import time
 import uuid
 import shutil
+import tempfile
 from datetime import datetime, timezone
 from threading import Lock
 import zipfile
 import psutil
 import signal
 
-import fiona
-import geopandas as gpd
 import numpy as np
+import orjson
+import pyogrio
 import rasterio
-from flask import Flask, abort, g, jsonify, request, send_file
+from flask import Flask, Request, Response, abort, g, jsonify, request, send_file
+from flask.json.provider import DefaultJSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
 from PIL import Image
 from rasterio.windows import Window
@@ -95,11 +98,94 @@ from .LayerManager import LayerManager
 from .LogManager import LogManager
 from .ScriptManager import ScriptManager
 
-ALLOWED_EXTENSIONS = {'.geojson', '.shp', '.gpkg', '.tif', '.tiff'}
+# Layer file extensions handled by LayerManager.process_layer_file
+ALLOWED_EXTENSIONS = {'.geojson', '.zip', '.gpkg', '.tif', '.tiff'}
+
+# Fast deflate level for bulk layer exports; GeoTIFFs are usually compressed already and are stored as-is
+EXPORT_ZIP_COMPRESSLEVEL = 1
+PRECOMPRESSED_LAYER_EXTENSIONS = {'.tif', '.tiff'}
+
+# Number of table rows encoded per chunk when streaming /layers/<id>/table
+TABLE_STREAM_BATCH_ROWS = 1000
+
+# Basemaps only change with a redeploy; let browsers reuse the list for a day
+BASEMAPS_CACHE_MAX_AGE = 86400
+
+# Allowance for multipart boundaries and form fields on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024
+
+
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Keeps the DefaultJSONProvider fallbacks (dates, UUIDs, dataclasses,
+    Decimals) for types orjson can't serialize natively, and encodes numpy
+    scalars and arrays directly.
+    """
+
+    def dumps(self, obj, **kwargs):
+        """
+        Serialize data as JSON.
+
+        :param obj: The data to serialize.
+        :param kwargs: sort_keys and indent are honoured; other options are ignored.
+        :return: JSON string.
+        """
+
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        """
+        Deserialize data as JSON.
+
+        :param s: Text or UTF-8 bytes.
+        :param kwargs: Ignored.
+        :return: Deserialized data.
+        """
+
+        return orjson.loads(s)
+
+
+class UploadRequest(Request):
+    """
+    Flask request that spools uploaded files straight to disk.
+
+    Werkzeug's default keeps small uploads in memory and puts larger ones in
+    the system temp directory. Uploads here are written to file_manager's temp
+    directory instead, next to where the handlers save them.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        """
+        Create the file that receives one uploaded file part.
+
+        :param total_content_length: Size of the whole request body, if known.
+        :param content_type: Content type of the uploaded part.
+        :param filename: Client-side file name of the uploaded part.
+        :param content_length: Size of the uploaded part, if known.
+        :return: Anonymous temporary file opened for reading and writing.
+        """
+
+        return tempfile.TemporaryFile("wb+", dir=file_manager.temp_dir)
 
 
 app = Flask(__name__)
+app.json = OrjsonJSONProvider(app)
+app.request_class = UploadRequest
+# Reject bodies larger than the biggest accepted upload (plus multipart framing) before reading them
+app.config["MAX_CONTENT_LENGTH"] = LayerManager.MAX_LAYER_FILE_SIZE + MULTIPART_OVERHEAD_BYTES
 CORS(app,origins=["http://localhost:5173"])
+# Compress JSON/GeoJSON bodies (including the streamed table and GeoJSON exports) when the
+# client accepts it; tiles, archives and rasters are already compressed and are left alone
+app.config["COMPRESS_MIN_SIZE"] = 4096
+app.config["COMPRESS_MIMETYPES"] = ["application/json", "application/geo+json"]
+Compress(app)
 file_manager = FileManager()
 basemap_manager = BasemapManager()
 layer_manager = LayerManager()
@@ -122,20 +208,21 @@ def handle_http_exception(e):
     """
 
     app.logger.warning(
-        "[%s] %s",
+        "[%s] HTTP Exception: %s",
         g.request_id,
-        f"HTTP Exception: {e}"
+        e
     )
-    response = e.get_response()
-    response.data = jsonify({
+    # Encode the JSON body directly instead of rendering Werkzeug's HTML page
+    # and replacing it; keep exception headers such as Allow or Retry-After
+    headers = [(key, value) for key, value in e.get_headers() if key.lower() != "content-type"]
+    body = orjson.dumps({
         "error": {
             "code": e.code,
             "name": e.name,
             "description": e.description
         }
-    }).data
-    response.content_type = "application/json"
-    return response
+    })
+    return Response(body, status=e.code, headers=headers, mimetype="application/json")
 
 @app.errorhandler(Exception)
 def handle_generic_exception(e):
@@ -150,11 +237,9 @@ def handle_generic_exception(e):
     """
 
     app.logger.error(
-        """Log an unhandled exception with the current request identifier."""
-
-        "[%s] %s",
+        "[%s] Unhandled Exception: %s",
         g.request_id,
-        f"Unhandled Exception: {e}"
+        e
     )
     return jsonify({
         "error": {
@@ -255,6 +340,78 @@ def _sanitize_for_json(data):
         return [_sanitize_for_json(v) for v in data]
     return data
 
+def _save_request_stream(destination_path):
+    """
+    Write the raw request body to disk in large chunks.
+
+    Used for raw (application/octet-stream) uploads, so the body never goes
+    through Werkzeug's multipart parser or is held in memory.
+
+    :param destination_path: Path of the file to create.
+    """
+
+    with open(destination_path, 'wb', buffering=0) as destination:
+        shutil.copyfileobj(request.stream, destination, FileManager.COPY_BUFSIZE)
+
+def _stream_table_response(table_data):
+    """
+    Stream a table-view payload as chunked JSON encoded with orjson.
+
+    The headers, total_rows and warnings are emitted first and the rows
+    follow in batches of TABLE_STREAM_BATCH_ROWS, so the full JSON document
+    is never built as a single string.
+
+    :param table_data: Dict with 'headers', 'rows', 'total_rows' and 'warnings'.
+    :return: Flask streaming Response with an application/json body.
+    """
+
+    def generate():
+        yield (
+            b'{"headers":' + orjson.dumps(table_data["headers"])
+            + b',"total_rows":' + orjson.dumps(table_data["total_rows"])
+            + b',"warnings":' + orjson.dumps(table_data["warnings"])
+            + b',"rows":['
+        )
+        rows = table_data["rows"]
+        for start in range(0, len(rows), TABLE_STREAM_BATCH_ROWS):
+            batch = orjson.dumps(rows[start:start + TABLE_STREAM_BATCH_ROWS])
+            # Strip the batch's own brackets and join it to the open rows array
+            yield (b',' if start else b'') + batch[1:-1]
+        yield b']}'
+
+    return Response(generate(), mimetype="application/json")
+
+def _send_layer_file(file_path, download_name):
+    """
+    Send a stored layer file as a download.
+
+    send_file stats the file itself (size, mtime, conditional/Range handling),
+    so a missing file is detected from that single stat instead of a separate
+    existence check beforehand.
+
+    :param file_path: Absolute path of the file to send.
+    :param download_name: File name presented to the client.
+    :raises InternalServerError: If the file does not exist.
+    :return: Flask file response.
+    """
+
+    try:
+        return send_file(file_path, as_attachment=True, download_name=download_name)
+    except FileNotFoundError as e:
+        raise InternalServerError(f"Exported file not found: {file_path}") from e
+
+def _silent_remove(path):
+    """
+    Remove a file if it exists.
+
+    :param path: Path of the file to remove.
+    """
+
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
 @app.route('/')
 def home():
     """Health-check endpoint indicating the backend is running."""
@@ -306,7 +463,7 @@ def add_script():
 
     # Store file temporarily in temp_dir
     temp_path = os.path.join(file_manager.temp_dir, stored_filename)
-    uploaded_file.save(temp_path)
+    uploaded_file.save(temp_path, buffer_size=FileManager.COPY_BUFSIZE)
 
     try:
         # Validate size
@@ -317,13 +474,11 @@ def add_script():
         script_manager.add_script(script_id, metadata)
 
     except HTTPException:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        _silent_remove(temp_path)
         raise
 
     except (OSError, IOError):
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        _silent_remove(temp_path)
         app.logger.error("Failed to store script", exc_info=True)
         abort(500, description="Failed to store script.")
 
@@ -426,9 +581,8 @@ def export_script(script_id):
     Export a single registered script and its metadata as a ZIP archive.
 
     This endpoint packages the specified Python script together with its
-    associated metadata into a ZIP file stored in the application's temporary
-    directory. The resulting archive is then returned to the client as a
-    downloadable attachment.
+    associated metadata into a ZIP archive built in memory, which is then
+    returned to the client as a downloadable attachment.
 
     ZIP contents:
         - scripts_metadata.json : JSON file containing metadata for the script
@@ -439,7 +593,6 @@ def export_script(script_id):
 
     :raises InternalServerError:
         - If the ZIP archive cannot be created
-        - If the exported file cannot be found after creation
 
     :return:
         Flask response sending the ZIP archive as an attachment
@@ -449,10 +602,11 @@ def export_script(script_id):
     script_metadata_values = script_manager.get_metadata(script_id)
 
     zip_filename = f"{script_id}_export.zip"
-    zip_path = os.path.join(file_manager.temp_dir, zip_filename)
+    # Scripts are small; building the archive in memory skips a temp-file write and read-back
+    zip_buffer = io.BytesIO()
 
     try:
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
             # Add metadata
             zipf.writestr(
                 "scripts_metadata.json",
@@ -476,9 +630,7 @@ def export_script(script_id):
             f"Failed to create ZIP archive: {e}"
         ) from e
 
-    export_file_abs = os.path.abspath(zip_path)
-    if not os.path.isfile(export_file_abs):
-        raise InternalServerError(f"Exported file not found: {export_file_abs}")
+    zip_buffer.seek(0)
 
     app.logger.info(
         "[%s] %s",
@@ -486,7 +638,7 @@ def export_script(script_id):
         f"Exported script {script_id} into {zip_filename}"
     )
 
-    return send_file(export_file_abs,as_attachment=True,download_name=f"{script_id}_export.zip")
+    return send_file(zip_buffer,mimetype="application/zip",as_attachment=True,download_name=zip_filename)
 
 @app.route('/scripts/export/all', methods=['GET'])
 def export_all_scripts():
@@ -494,20 +646,19 @@ def export_all_scripts():
     Export all registered layers as a ZIP archive.
 
     This endpoint collects all stored spatial layers and packages them into a
-    single ZIP file saved in the application's temporary directory. Each layer
+    single in-memory ZIP archive. Each layer
     is added to the archive using its human-readable layer name as the filename.
 
     ZIP contents:
         - <layer_name>.gpkg : One GeoPackage file per registered layer
 
-    The ZIP archive is created in the application's temporary directory and
-    validated before being returned to the client as a downloadable attachment.
+    The ZIP archive is built in memory and returned to the client as a
+    downloadable attachment.
 
     :raises InternalServerError:
         - If layer metadata is missing or invalid
         - If a layer file cannot be found
         - If the ZIP archive cannot be created
-        - If the exported ZIP file cannot be found after creation
 
     :return:
         Flask response sending the ZIP archive as an attachment
@@ -518,10 +669,10 @@ def export_all_scripts():
     scripts_metadata = script_manager.load_metadata()
 
     zip_filename = "all_scripts_export.zip"
-    zip_path = os.path.join(file_manager.temp_dir, zip_filename)
+    zip_buffer = io.BytesIO()
 
     try:
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
             # Add metadata
             zipf.writestr(
                 "scripts_metadata.json",
@@ -546,9 +697,7 @@ def export_all_scripts():
             f"Failed to create ZIP archive: {e}"
         ) from e
 
-    export_file_abs = os.path.abspath(zip_path)
-    if not os.path.isfile(export_file_abs):
-        raise InternalServerError(f"Exported file not found: {export_file_abs}")
+    zip_buffer.seek(0)
 
     app.logger.info(
         "[%s] %s",
@@ -556,7 +705,7 @@ def export_all_scripts():
         f"Exported all scripts into {zip_filename} with {len(scripts_ids)} scripts"
     )
 
-    return send_file(export_file_abs,as_attachment=True,download_name='all_scripts_export.zip')
+    return send_file(zip_buffer,mimetype="application/zip",as_attachment=True,download_name=zip_filename)
 
 
 @app.route('/scripts/import', methods=['POST'])
@@ -609,7 +758,7 @@ def import_scripts():
 
     # Store file temporarily in temp_dir
     temp_zip_path = os.path.join(file_manager.temp_dir, f"{uuid.uuid4()}.zip")
-    uploaded_zip.save(temp_zip_path)
+    uploaded_zip.save(temp_zip_path, buffer_size=FileManager.COPY_BUFSIZE)
 
     imported_scripts = []
     extract_dir = os.path.join(file_manager.temp_dir, str(uuid.uuid4()))
@@ -621,13 +770,16 @@ def import_scripts():
         with zipfile.ZipFile(temp_zip_path, 'r') as zip_ref:
             zip_ref.extractall(extract_dir)
 
-        # Locate *metadata.json (anywhere inside ZIP)
+        # Locate *metadata.json and index the extracted files (anywhere inside ZIP)
+        # in a single walk; the first match in walk order wins for duplicate names
         metadata_files = []
+        extracted_files = {}
 
         for root, _, files in os.walk(extract_dir):
             for filename in files:
                 if filename.lower().endswith("metadata.json"):
                     metadata_files.append(os.path.join(root, filename))
+                extracted_files.setdefault(filename, os.path.join(root, filename))
 
         if not metadata_files:
             raise BadRequest("ZIP file must contain a *metadata.json file.")
@@ -657,14 +809,7 @@ def import_scripts():
             if not isinstance(metadata, dict):
                 continue
 
-            script_filename = f"{script_id}.py"
-            script_path = None
-
-            # Search for the script file
-            for root, _, files in os.walk(extract_dir):
-                if script_filename in files:
-                    script_path = os.path.join(root, script_filename)
-                    break
+            script_path = extracted_files.get(f"{script_id}.py")
 
             if not script_path:
                 continue
@@ -688,13 +833,11 @@ def import_scripts():
                 })
 
             except HTTPException:
-                if os.path.exists(temp_script_path):
-                    os.remove(temp_script_path)
+                _silent_remove(temp_script_path)
                 raise
 
             except (OSError, IOError):
-                if os.path.exists(temp_script_path):
-                    os.remove(temp_script_path)
+                _silent_remove(temp_script_path)
                 app.logger.error(
                     "Failed to import script %s from ZIP",
                     script_id,
@@ -709,10 +852,8 @@ def import_scripts():
         raise BadRequest("Invalid ZIP file.")
 
     finally:
-        if os.path.exists(temp_zip_path):
-            os.remove(temp_zip_path)
-        if os.path.exists(extract_dir):
-            shutil.rmtree(extract_dir, ignore_errors=True)
+        _silent_remove(temp_zip_path)
+        shutil.rmtree(extract_dir, ignore_errors=True)
 
     return jsonify({
         "message": "Scripts imported successfully",
@@ -867,8 +1008,8 @@ def run_script(script_id):
 
         return jsonify(response_json), status_code
 
-    except BadRequest:
-        # Client errors (4xx) - re-raise to be handled by Flask
+    except HTTPException:
+        # Client errors (4xx, e.g. malformed or oversized body) - re-raise to be handled by Flask
         with running_scripts_lock:
             running_scripts[script_id]["status"] = "failed"
         raise
@@ -953,12 +1094,12 @@ def load_basemap(basemap_id):
     :return: JSON response containing the basemap definition.
     """
 
-    basemap = basemap_manager.get_basemap(basemap_id)
+    basemap_json = basemap_manager.get_basemap_json(basemap_id)
 
-    if basemap is None:
+    if basemap_json is None:
         return jsonify({"error": f"Basemap with id {basemap_id} not found"}), 404
 
-    return jsonify(basemap), 200
+    return Response(basemap_json, mimetype="application/json"), 200
 
 @app.route('/basemaps', methods=['GET'])
 def list_basemaps():
@@ -967,10 +1108,19 @@ def list_basemaps():
 
     Retrieves and returns all basemap configurations registered in the system.
 
+    The body is encoded once when the configuration is loaded and is served
+    with an ETag and a public Cache-Control lifetime, so browsers reuse it and
+    clients revalidating with If-None-Match get a 304.
+
     :return: JSON response containing the list of basemaps.
     """
 
-    return jsonify(basemap_manager.list_basemaps()), 200
+    body, etag = basemap_manager.list_basemaps_json()
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = BASEMAPS_CACHE_MAX_AGE
+    return response.make_conditional(request)
 
 # Layer Management Endpoints
 @app.route('/layers', methods=['GET'])
@@ -1021,28 +1171,64 @@ def add_layer():
     Accepts vector or raster data via multipart upload, validates file size and
     format, processes the layer according to its type, and stores its metadata.
 
+    Large files can also be sent as a raw body (Content-Type: application/octet-stream)
+    with the file name in the 'filename' query parameter and optional 'layers'
+    query parameters; the body is then streamed to disk without multipart parsing.
+
     :raises BadRequest: If validation fails or the file format is unsupported.
     :return: JSON response containing created layer IDs and metadata.
     """
 
-    # Accept file from the browser via multipart/form-data
-    added_file = request.files.get('file')
-    if not added_file:
-        raise BadRequest("You must upload a file under the 'file' field.")
+    raw_upload = request.mimetype == "application/octet-stream"
 
-    # Get optional selected layers parameter (for geopackages)
-    selected_layers = request.form.getlist('layers')
+    if raw_upload:
+        filename = os.path.basename(request.args.get('filename', ''))
+        if not filename:
+            raise BadRequest("Raw uploads must name the file in the 'filename' query parameter.")
 
-    # File is temporarily stored in tmp_dir folder for handling
-    temp_path = os.path.join(file_manager.temp_dir, added_file.filename)
-    added_file.save(temp_path)
+        # Reject oversized, unsupported or duplicate uploads before reading the body
+        if (request.content_length or 0) > layer_manager.MAX_LAYER_FILE_SIZE:
+            raise BadRequest("The uploaded file exceeds the maximum allowed size.")
+
+        file_name, extension = os.path.splitext(filename)
+        if extension.lower() not in ALLOWED_EXTENSIONS:
+            raise BadRequest(f"File extension '{extension}' is not supported.")
+
+        if layer_manager.check_layer_name_exists(file_name):
+            raise BadRequest("A Layer with the same name already exists")
+
+        # Get optional selected layers parameter (for geopackages)
+        selected_layers = request.args.getlist('layers')
+
+        # File is temporarily stored in tmp_dir folder for handling
+        temp_path = os.path.join(file_manager.temp_dir, filename)
+    else:
+        # Accept file from the browser via multipart/form-data
+        added_file = request.files.get('file')
+        if not added_file:
+            raise BadRequest("You must upload a file under the 'file' field.")
+
+        # Keep only the final path component of the client-supplied name
+        filename = os.path.basename(added_file.filename)
+
+        # Get optional selected layers parameter (for geopackages)
+        selected_layers = request.form.getlist('layers')
+
+        # File is temporarily stored in tmp_dir folder for handling
+        temp_path = os.path.join(file_manager.temp_dir, filename)
+        added_file.save(temp_path, buffer_size=FileManager.COPY_BUFSIZE)
 
     try:
+        # Streamed inside the try, so a partially written body is removed as well
+        if raw_upload:
+            _save_request_stream(temp_path)
+
         if os.path.getsize(temp_path) > layer_manager.MAX_LAYER_FILE_SIZE:
             raise BadRequest("The uploaded file exceeds the maximum allowed size.")
 
-        file_name, extension = os.path.splitext(added_file.filename)
+        file_name, extension = os.path.splitext(filename)
 
+        # Checked again for raw uploads: the name may have been taken while the body streamed
         if layer_manager.check_layer_name_exists(file_name):
             raise BadRequest("A Layer with the same name already exists")
 
@@ -1058,8 +1244,7 @@ def add_layer():
 
     finally:
         # Ensure temp file is always cleaned up
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        _silent_remove(temp_path)
 
     # Normalize return types
     if not isinstance(layer_id, list):
@@ -1084,32 +1269,30 @@ def preview_geopackage_layers():
     if not added_file:
         raise BadRequest("You must upload a file under the 'file' field.")
 
+    # Keep only the final path component of the client-supplied name
+    filename = os.path.basename(added_file.filename)
+    _, file_extension = os.path.splitext(filename)
+
+    # Reject other formats before anything is written to disk
+    if file_extension.lower() != ".gpkg":
+        raise BadRequest("This endpoint only accepts GeoPackage (.gpkg) files.")
+
     # File is temporarily stored in tmp_dir folder for handling
-    temp_path = os.path.join(file_manager.temp_dir, added_file.filename)
-    added_file.save(temp_path)
+    temp_path = os.path.join(file_manager.temp_dir, filename)
+    added_file.save(temp_path, buffer_size=FileManager.COPY_BUFSIZE)
 
     if os.path.getsize(temp_path) > layer_manager.MAX_LAYER_FILE_SIZE:
         os.remove(temp_path)
         raise BadRequest("The uploaded file exceeds the maximum allowed size.")
 
-    _, file_extension = os.path.splitext(added_file.filename)
-
-    if file_extension.lower() != ".gpkg":
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-        raise BadRequest("This endpoint only accepts GeoPackage (.gpkg) files.")
-
     try:
         layers = layer_manager.get_geopackage_layers(temp_path)
         return jsonify({"layers": layers}), 200
     except ValueError as e:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
         raise BadRequest(str(e)) from e
     finally:
         # Clean up temp file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        _silent_remove(temp_path)
 
 @app.route('/layers/<layer_id>', methods=['GET'])
 def get_layer(layer_id):
@@ -1133,16 +1316,18 @@ def get_layer(layer_id):
     extension = layer_manager.get_layer_extension(layer_id)
 
     if extension == ".gpkg":
-        export_file = layer_manager.export_geopackage_layer_to_geojson(layer_id)
-        extension = ".geojson"
-    else:
-        export_file = layer_manager.export_raster_layer(layer_id)
+        # Vector layers are converted on the fly and streamed, without a temporary GeoJSON file
+        response = Response(
+            layer_manager.stream_geopackage_layer_as_geojson(layer_id),
+            mimetype="application/geo+json"
+        )
+        # Quoted and escaped by Werkzeug, the same way send_file builds it
+        response.headers.set("Content-Disposition", "attachment", filename=f"{layer_id}.geojson")
+        return response
 
-    export_file_abs = os.path.abspath(export_file)
-    if not os.path.isfile(export_file_abs):
-        raise InternalServerError(f"Exported file not found: {export_file_abs}")
+    export_file = layer_manager.export_raster_layer(layer_id)
 
-    return send_file(export_file_abs, as_attachment=True, download_name=f"{layer_id}{extension}")
+    return _send_layer_file(os.path.abspath(export_file), f"{layer_id}{extension}")
 
 @app.route('/layers/export/all', methods=['GET'])
 def export_all_layers():
@@ -1152,7 +1337,7 @@ def export_all_layers():
     zip_path = os.path.join(file_manager.temp_dir, zip_filename)
 
     try:
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=EXPORT_ZIP_COMPRESSLEVEL) as zipf:
             # Add layers at ZIP root
             for layer_id in layer_ids:
                 metadata = layer_manager.get_metadata(layer_id)
@@ -1169,9 +1354,16 @@ def export_all_layers():
                 )
 
                 if os.path.exists(layer_path):
-                    zipf.write(
+                    compress_type = (
+                        zipfile.ZIP_STORED
+                        if extension in PRECOMPRESSED_LAYER_EXTENSIONS
+                        else zipfile.ZIP_DEFLATED
+                    )
+                    file_manager.add_file_to_zip(
+                        zipf,
                         layer_path,
-                        arcname=f"{layer_name}{extension}"
+                        arcname=f"{layer_name}{extension}",
+                        compress_type=compress_type
                     )
 
     except Exception as e:
@@ -1379,9 +1571,7 @@ def export_layer(layer_id):
     layer = layer_manager.get_layer_path(layer_id)
     extension = layer_manager.get_layer_extension(layer_id)
 
-    export_file_abs = os.path.abspath(layer)
-    if not os.path.isfile(export_file_abs):
-        raise InternalServerError(f"Exported file not found: {export_file_abs}")
+    response = _send_layer_file(os.path.abspath(layer), f"{layer_id}{extension}")
 
     app.logger.info(
         "[%s] %s",
@@ -1389,7 +1579,7 @@ def export_layer(layer_id):
         f"Exported layer {layer}"
     )
 
-    return send_file(export_file_abs, as_attachment=True, download_name=f"{layer_id}{extension}")
+    return response
 
 @app.route('/layers/<layer_id>', methods=['DELETE'])
 def remove_layer(layer_id):
@@ -1424,8 +1614,7 @@ def remove_layer(layer_id):
         if layer_path:
             os.remove(layer_path)
 
-        if os.path.isfile(metadata_path):
-            os.remove(metadata_path)
+        _silent_remove(metadata_path)
 
     except OSError as e:
         raise InternalServerError(f"Failed to remove layer {layer_id}: {str(e)}") from e
@@ -1490,7 +1679,7 @@ def extract_data_from_layer_for_table_view(layer_id):
 
     :param layer_id: Identifier of the layer.
     :raises BadRequest: If the layer identifier is missing or refers to a raster.
-    :return: JSON response containing table headers, rows, and metadata.
+    :return: Streamed JSON response containing table headers, rows, and metadata.
     """
 
     if not layer_id:
@@ -1502,7 +1691,7 @@ def extract_data_from_layer_for_table_view(layer_id):
 
     response = data_manager.check_cache(layer_id)
     if response:
-        return jsonify(response), 200
+        return _stream_table_response(response), 200
 
     # 1) Descobrir caminho do GPKG
     gpkg_path = os.path.join(file_manager.layers_dir, f"{layer_id}.gpkg")
@@ -1510,21 +1699,22 @@ def extract_data_from_layer_for_table_view(layer_id):
         raise BadRequest("Vector layer file not found")
 
     # 2) Ler a primeira layer do GPKG
-    layers = fiona.listlayers(gpkg_path)
-    if not layers:
+    layers = pyogrio.list_layers(gpkg_path)
+    if len(layers) == 0:
         raise BadRequest("No layers found in GeoPackage")
-    layer_name = layers[0]
+    layer_name = layers[0][0]
 
-    gdf = gpd.read_file(gpkg_path, layer=layer_name)
-
-    # 3) Remover geometria para tabela
-    if "geometry" in gdf.columns:
-        gdf = gdf.drop(columns=["geometry"])
+    # 3) Ler apenas os atributos; a geometria nunca é descodificada
+    gdf = pyogrio.read_dataframe(gpkg_path, layer=layer_name, read_geometry=False)
 
     total_rows = len(gdf)
 
+    # astype(object) mantém os valores como escalares Python (int, float, str)
+    # e evita que iloc[0] promova colunas int a float numa linha mista
+    values = gdf.astype(object)
+
     headers = []
-    sample_row = gdf.iloc[0].to_dict() if total_rows > 0 else {}
+    sample_row = values.iloc[0] if total_rows > 0 else {}
     for col in gdf.columns:
         headers.append({
             "name": col,
@@ -1532,27 +1722,27 @@ def extract_data_from_layer_for_table_view(layer_id):
             "sortable": True
         })
 
-    rows = []
-    warnings = set()
+    # 4) Formatar coluna a coluna em vez de célula a célula com iterrows
+    format_value = data_manager.format_value_for_table_view
+    if len(gdf.columns) > 0:
+        rows = values.apply(lambda column: column.map(format_value)).to_dict(orient="records")
+    else:
+        # Sem colunas de atributos o to_dict devolve [], mas cada feature continua a ser uma linha
+        rows = [{} for _ in range(total_rows)]
 
-    for _, row in gdf.iterrows():
-        formatted = {}
-        for col, value in row.items():
-            formatted[col] = data_manager.format_value_for_table_view(value)
-            if value is None:
-                warnings.add(f"Null value detected in field '{col}'")
-        rows.append(formatted)
+    null_columns = gdf.columns[gdf.isna().any()]
+    warnings = [f"Null value detected in field '{col}'" for col in null_columns]
 
     response_data = {
         "headers": headers,
         "rows": rows,
         "total_rows": total_rows,
-        "warnings": list(warnings)
+        "warnings": warnings
     }
 
     data_manager.insert_to_cache(layer_id, response_data, 10)
 
-    return jsonify(response_data), 200
+    return _stream_table_response(response_data), 200
 
 
 if __name__ == '__main__':
@@ -0,0 +1,42 @@
+"""
+Gunicorn configuration for the GeoDummy backend.
+
+Serves App.app:app with a threaded worker so that long requests (script runs,
+uploads, layer exports) do not block the rest of the API.
+
+A single worker process is used on purpose: running_scripts, the DataManager
+cache and stop_script (which signals the children of the current process) all
+rely on in-process state, so requests must share one process. Concurrency
+comes from the worker's threads instead.
+
+Script runs are not moved to a separate executor: run_script blocks its own
+request thread until the script subprocess exits, and the other gthread
+threads keep serving status, stop and tile requests meanwhile. (Flask's
+development server behind `python -m App.app` is threaded by default too.)
+
+Usage:
+    gunicorn -c App/gunicorn_conf.py App.app:app
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5050')}"
+
+workers = 1
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
+# Scripts may run for up to 600 seconds inside a request (see ScriptManager.run_script)
+timeout = 660
+graceful_timeout = 30
+keepalive = 5
+
+# Keep the worker heartbeat file off the container's overlay filesystem
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# send_file responses go through wsgi.file_wrapper; let gunicorn hand them to
+# sendfile(2) so layer downloads and export archives never pass through Python
+sendfile = True
+
+accesslog = "-"
+errorlog = "-"
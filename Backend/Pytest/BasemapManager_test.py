@@ -63,3 +63,22 @@ def test_get_basemap_not_found(tmp_path, sample_config):
     manager = BasemapManager(config_path=str(config_path))
 
     assert manager.get_basemap("does_not_exist") is None
+
+def test_list_basemaps_json(tmp_path, sample_config):
+    config_path = tmp_path / "basemaps.json"
+    config_path.write_text(json.dumps(sample_config), encoding="utf-8")
+
+    manager = BasemapManager(config_path=str(config_path))
+
+    body, etag = manager.list_basemaps_json()
+    assert json.loads(body) == sample_config["basemaps"]
+    assert manager.list_basemaps_json()[1] == etag
+
+def test_get_basemap_json(tmp_path, sample_config):
+    config_path = tmp_path / "basemaps.json"
+    config_path.write_text(json.dumps(sample_config), encoding="utf-8")
+
+    manager = BasemapManager(config_path=str(config_path))
+
+    assert json.loads(manager.get_basemap_json("esri_satellite")) == sample_config["basemaps"][1]
+    assert manager.get_basemap_json("does_not_exist") is None
@@ -1,4 +1,5 @@
 from unittest.mock import patch
+import zipfile
 import pytest
 import geopandas as gpd
 from pathlib import Path
@@ -97,13 +98,13 @@ class TestFileManager:
     
     def test_copy_file_shutil_failure_raises_value_error(self) -> None:
         """
-        Branch: exception inside shutil.copy triggers
+        Branch: exception inside clone_file triggers
         'Error copying file: ...' ValueError.
         """
         # Create a real source file so __validate_paths_and_file passes
         src_file = self._create_dummy_geojson("test_copy_fail.geojson")
 
-        with patch("App.FileManager.shutil.copy") as mock_copy:
+        with patch.object(FileManager, "clone_file") as mock_copy:
             mock_copy.side_effect = RuntimeError("disk error")
 
             with pytest.raises(ValueError) as excinfo:
@@ -140,4 +141,96 @@ class TestFileManager:
         with pytest.raises(ValueError) as excinfo:
             self.fm.copy_file(str(src_file), fake_dest)
 
-        assert "Invalid destination path" in str(excinfo.value)
\ No newline at end of file
+        assert "Invalid destination path" in str(excinfo.value)
+
+    def test_clone_file_copies_contents(self) -> None:
+        """Test that clone_file reproduces the source bytes and leaves the source intact."""
+        src_file = self.src_dir / "clone_src.bin"
+        src_file.write_bytes(b"geo" * 100_000)
+        dest_file = self.dest_dir / "clone_dest.bin"
+
+        FileManager.clone_file(str(src_file), str(dest_file))
+
+        assert dest_file.read_bytes() == src_file.read_bytes()
+        assert src_file.exists()
+
+    def test_clone_file_falls_back_to_copyfile(self) -> None:
+        """
+        Branch: os.copy_file_range unsupported (OSError) falls back to shutil.copyfile.
+        """
+        src_file = self.src_dir / "fallback_src.bin"
+        src_file.write_bytes(b"raster-bytes")
+        dest_file = self.dest_dir / "fallback_dest.bin"
+
+        with patch("App.FileManager.os.copy_file_range", side_effect=OSError("EXDEV"), create=True):
+            FileManager.clone_file(str(src_file), str(dest_file))
+
+        assert dest_file.read_bytes() == b"raster-bytes"
+
+    def test_add_file_to_zip_streams_member(self) -> None:
+        """
+        Branch: file streamed into an open archive with the requested compression.
+        """
+        src_file = self.src_dir / "layer.geojson"
+        src_file.write_bytes(b'{"type": "FeatureCollection"}' * 100)
+        zip_path = self.dest_dir / "bundle.zip"
+
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
+            FileManager.add_file_to_zip(zipf, str(src_file), "renamed.geojson")
+            FileManager.add_file_to_zip(zipf, str(src_file), "stored.geojson", compress_type=zipfile.ZIP_STORED)
+
+        with zipfile.ZipFile(zip_path) as zipf:
+            assert zipf.read("renamed.geojson") == src_file.read_bytes()
+            assert zipf.getinfo("renamed.geojson").compress_type == zipfile.ZIP_DEFLATED
+            assert zipf.getinfo("stored.geojson").compress_type == zipfile.ZIP_STORED
+
+    def test_add_file_to_zip_uses_archive_level_without_zip64(self) -> None:
+        """
+        Branch: deflated members use the archive's compression level, and small
+        members carry no Zip64 extra field in their local header.
+        """
+        import struct
+        import zlib
+
+        payload = bytes(range(256)) * 2000
+        src_file = self.src_dir / "layer.geojson"
+        src_file.write_bytes(payload)
+        zip_path = self.dest_dir / "bundle.zip"
+
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
+            FileManager.add_file_to_zip(zipf, str(src_file), "layer.geojson")
+
+        compressor = zlib.compressobj(1, zlib.DEFLATED, -15)
+        level_one_size = len(compressor.compress(payload) + compressor.flush())
+
+        with zipfile.ZipFile(zip_path) as zipf:
+            info = zipf.getinfo("layer.geojson")
+            assert info.compress_size == level_one_size
+            assert zipf.read("layer.geojson") == payload
+
+        # Local file header: the extra field length is the last 2 of its 30 fixed bytes
+        with open(zip_path, "rb") as f:
+            f.seek(info.header_offset)
+            local_header = f.read(30)
+        assert struct.unpack("<H", local_header[28:30])[0] == 0
+
+    def test_extract_zip_members_streams_selected_members_flat(self) -> None:
+        """
+        Branch: only requested members extracted, under their base names; directory entries skipped.
+        """
+        zip_path = self.src_dir / "bundle.zip"
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+            zipf.writestr("roads.shp", b"shp" * 1000)
+            zipf.writestr("../escape/roads.dbf", b"dbf")
+            zipf.writestr("folder/", b"")
+            zipf.writestr("skipped.txt", b"no")
+
+        with zipfile.ZipFile(zip_path) as zipf:
+            extracted = FileManager.extract_zip_members(
+                zipf, ["roads.shp", "../escape/roads.dbf", "folder/"], str(self.dest_dir)
+            )
+
+        assert extracted == [str(self.dest_dir / "roads.shp"), str(self.dest_dir / "roads.dbf")]
+        assert (self.dest_dir / "roads.shp").read_bytes() == b"shp" * 1000
+        assert (self.dest_dir / "roads.dbf").read_bytes() == b"dbf"
+        assert not (self.dest_dir / "skipped.txt").exists()
@@ -4,10 +4,18 @@ import pytest
 import uuid
 import math
 import shutil
+import zipfile
 from unittest.mock import MagicMock, patch, mock_open, call
 from typing import Generator
 
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyogrio
+from shapely.geometry import Point
+
 # Import the class to test
+from App.FileManager import FileManager
 from App.LayerManager import LayerManager
 
 # ==========================================
@@ -28,6 +36,10 @@ def layer_manager(mock_file_manager: MagicMock) -> LayerManager:
     with patch('os.listdir', return_value=[]):
         return LayerManager()
 
+def _zip_with_members(names):
+    """Patch kwargs making a mocked zipfile.ZipFile report the given member names."""
+    return {"return_value.__enter__.return_value.namelist.return_value": names}
+
 # ==========================================
 # TEST SUITE
 # ==========================================
@@ -72,8 +84,7 @@ class TestLayerManager:
         
         # Mock zip file content
         mock_zip.return_value.__enter__.return_value.namelist.return_value = ['test.shp']
-        with patch('os.listdir', return_value=['test.shp']), \
-             patch('os.remove'), \
+        with patch('os.remove'), \
              patch.object(LayerManager, '_LayerManager__get_gpkg_metadata', return_value={}), \
              patch.object(LayerManager, '_LayerManager__move_to_permanent'):
             
@@ -83,16 +94,43 @@ class TestLayerManager:
             mock_gdf.to_file.assert_called()
 
     def test_add_shapefile_zip_no_shp_error(self, layer_manager: LayerManager) -> None:
-        """Edge case: Zip file contains no .shp file."""
-        with patch('zipfile.ZipFile'), \
+        """Edge case: Zip file contains no .shp file, so nothing is extracted."""
+        with patch('zipfile.ZipFile') as mock_zip, \
              patch('os.makedirs'), \
-             patch('os.listdir', return_value=['not_a_shp.txt']), \
-             patch('os.remove'), \
-             patch('shutil.rmtree'):
+             patch('os.remove') as mock_remove:
+            zf = mock_zip.return_value.__enter__.return_value
+            zf.namelist.return_value = ['not_a_shp.txt', 'nested/inner.shp']
             
             with pytest.raises(ValueError, match="No .shp file found"):
                 layer_manager.add_shapefile_zip("empty.zip")
 
+            zf.extractall.assert_not_called()
+            mock_remove.assert_called_once_with("empty.zip")
+
+    def test_add_shapefile_zip_extracts_only_shapefile_components(self, layer_manager: LayerManager, tmp_path) -> None:
+        """Only members sharing the .shp stem are extracted; the rest of the archive is skipped."""
+        zip_path = tmp_path / "roads.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            for name in ["roads.shp", "roads.shx", "roads.dbf", "roads.prj", "readme.pdf", "other.tif"]:
+                zf.writestr(name, b"x")
+
+        extracted = {}
+
+        def read_file(path, **kwargs):
+            extracted["files"] = sorted(os.listdir(os.path.dirname(path)))
+            raise Exception("stop")
+
+        with patch('App.LayerManager.file_manager') as mock_fm, \
+             patch('geopandas.read_file', side_effect=read_file):
+            mock_fm.temp_dir = str(tmp_path)
+            mock_fm.extract_zip_members.side_effect = FileManager.extract_zip_members
+
+            with pytest.raises(ValueError, match="Error reading shapefile"):
+                layer_manager.add_shapefile_zip(str(zip_path))
+
+        assert extracted["files"] == ["roads.dbf", "roads.prj", "roads.shp", "roads.shx"]
+        assert not zip_path.exists()
+
     @patch('geopandas.read_file')
     def test_add_geojson_reprojection(self, mock_gpd, layer_manager: LayerManager) -> None:
         """Test GeoJSON import with CRS reprojection logic."""
@@ -133,7 +171,7 @@ class TestLayerManager:
             assert info["width"] == 100
             assert info["crs"] == "EPSG:4326"
 
-    @patch('fiona.listlayers')
+    @patch('App.LayerManager.pyogrio.list_layers')
     @patch('geopandas.read_file')
     @patch('os.path.isfile')
     def test_get_layer_information_vector_success(
@@ -145,7 +183,7 @@ class TestLayerManager:
         """
         layer_id = "test_vector"
         mock_isfile.return_value = True
-        mock_list.return_value = ["layer_0"]
+        mock_list.return_value = np.array([["layer_0", "Point"]], dtype=object)
         
         # Mock GeoDataFrame
         mock_gdf = MagicMock()
@@ -178,7 +216,7 @@ class TestLayerManager:
             with pytest.raises(ValueError, match="not found in rasters or GeoPackage"):
                 layer_manager.get_layer_information("ghost_layer")
 
-    @patch('fiona.listlayers', side_effect=Exception("Disk Error"))
+    @patch('App.LayerManager.pyogrio.list_layers', side_effect=Exception("Disk Error"))
     @patch('os.path.isfile', return_value=True)
     def test_get_layer_information_gpkg_error(self, mock_isfile: MagicMock, mock_list: MagicMock, layer_manager: LayerManager) -> None:
         """Test error handling when the GeoPackage is unreadable."""
@@ -186,6 +224,31 @@ class TestLayerManager:
             with pytest.raises(ValueError, match="Error reading GeoPackage: Disk Error"):
                 layer_manager.get_layer_information("corrupt_layer")
 
+    @patch('rasterio.open')
+    def test_get_layer_information_cached_until_file_changes(
+        self, mock_rasterio_open: MagicMock, layer_manager: LayerManager, tmp_path
+    ) -> None:
+        """Repeated lookups reuse the cached info until the layer file's mtime/size changes."""
+        raster_path = tmp_path / "cached_raster.tif"
+        raster_path.write_bytes(b"v1")
+
+        mock_src = mock_rasterio_open.return_value.__enter__.return_value
+        mock_src.count = 1
+        mock_src.crs = None
+
+        with patch.object(layer_manager, 'is_raster', return_value=str(raster_path)):
+            first = layer_manager.get_layer_information("cached_raster")
+            first["bands"] = 99  # callers get a copy, not the cached dict
+            second = layer_manager.get_layer_information("cached_raster")
+
+            assert second["bands"] == 1
+            assert mock_rasterio_open.call_count == 1
+
+            raster_path.write_bytes(b"version 2")
+            layer_manager.get_layer_information("cached_raster")
+
+            assert mock_rasterio_open.call_count == 2
+
     # --- get_layer_path Method Tests ---
 
     def test_get_layer_path_raster(self, layer_manager: LayerManager) -> None:
@@ -228,6 +291,21 @@ class TestLayerManager:
             # This should now pass as the source code returns None if the file isn't found
             assert result is None
     
+    def test_get_layer_paths_batched(self, layer_manager: LayerManager, mock_file_manager: MagicMock, tmp_path) -> None:
+        """Test that several layers are resolved from one listing, rasters taking precedence."""
+        mock_file_manager.layers_dir = str(tmp_path)
+        for name in ["dem.tif", "roads.gpkg", "both.TIFF", "both.gpkg", "roads_metadata.json"]:
+            (tmp_path / name).write_text("")
+
+        result = layer_manager.get_layer_paths(["dem", "roads", "both", "missing"])
+
+        assert result == {
+            "dem": os.path.join(str(tmp_path), "dem.tif"),
+            "roads": os.path.join(str(tmp_path), "roads.gpkg"),
+            "both": os.path.join(str(tmp_path), "both.TIFF"),
+            "missing": None,
+        }
+
     def test_add_raster_already_exists(self, layer_manager: LayerManager) -> None:
         """Edge case: Adding a raster with a name that already exists."""
         with patch('os.path.isfile', return_value=True), \
@@ -421,9 +499,69 @@ class TestLayerManager:
             with pytest.raises(ValueError, match="Failed to import layer 'faulty_layer'"):
                 layer_manager.add_gpkg_layers(gpkg_path)
             
-            # Verify source file removal is NOT reached if loop breaks early via raise
-            # (Note: Based on code structure, os.remove is outside the loop and won't execute if an exception is raised)
-            mock_remove.assert_not_called()
+            # The source file is removed even though the import failed
+            mock_remove.assert_called_once_with(gpkg_path)
+
+    @pytest.mark.filterwarnings("ignore:'crs' was not provided")
+    def test_add_gpkg_layers_failure_leaves_no_orphans(
+        self, layer_manager: LayerManager, mock_file_manager: MagicMock, tmp_path
+    ) -> None:
+        """
+        Edge Case: one layer of a real GeoPackage cannot be imported.
+        The layers imported alongside it are removed again and the input file is deleted.
+        """
+        layers_dir = tmp_path / "layers"
+        temp_dir = tmp_path / "temp"
+        layers_dir.mkdir()
+        temp_dir.mkdir()
+        mock_file_manager.layers_dir = str(layers_dir)
+        mock_file_manager.temp_dir = str(temp_dir)
+
+        gpkg_path = tmp_path / "mixed.gpkg"
+        for layer_name in ("good_a", "good_b"):
+            gpd.GeoDataFrame({"value": [1]}, geometry=[Point(1, 2)], crs="EPSG:4326").to_file(
+                gpkg_path, layer=layer_name, driver="GPKG"
+            )
+        gpd.GeoDataFrame({"value": [1]}, geometry=[Point(1, 2)]).to_file(
+            gpkg_path, layer="no_crs", driver="GPKG"
+        )
+
+        with pytest.raises(ValueError, match="Failed to import layer 'no_crs'"):
+            layer_manager.add_gpkg_layers(str(gpkg_path))
+
+        assert os.listdir(layers_dir) == []
+        assert os.listdir(temp_dir) == []
+        assert not gpkg_path.exists()
+
+    @patch('geopandas.read_file')
+    @patch('os.remove')
+    def test_add_gpkg_layers_keeps_input_order(
+        self,
+        mock_remove: MagicMock,
+        mock_read_file: MagicMock,
+        layer_manager: LayerManager
+    ) -> None:
+        """
+        Layers are imported concurrently, but ids and metadata follow the GeoPackage's layer order.
+        """
+        layers = [f"layer_{i}" for i in range(12)]
+
+        mock_gdf = MagicMock()
+        mock_gdf.crs.to_string.return_value = "EPSG:4326"
+        mock_read_file.return_value = mock_gdf
+
+        with patch.object(layer_manager, '_LayerManager__retrieve_spatial_layers_from_incoming_gpkg', return_value=layers), \
+             patch.object(layer_manager, '_LayerManager__get_gpkg_metadata', side_effect=lambda path, crs: {"path": path}), \
+             patch.object(layer_manager, '_LayerManager__move_to_permanent'):
+
+            ids, metadata_list = layer_manager.add_gpkg_layers("many.gpkg")
+
+        assert [meta["path"] for meta in metadata_list] == [
+            os.path.join("/tmp/temp", f"{layer_id}.gpkg") for layer_id in ids
+        ]
+        written_layers = sorted(call.kwargs["layer"] for call in mock_gdf.to_file.call_args_list)
+        assert written_layers == sorted(layers)
+        mock_remove.assert_called_once_with("many.gpkg")
 
     def test_add_gpkg_layers_empty_input(self, layer_manager: LayerManager) -> None:
         """
@@ -441,156 +579,72 @@ class TestLayerManager:
             assert metas == []
             mock_remove.assert_called_once_with(gpkg_path)
     
-    # --- export_geopackage_layer_to_geojson Method Tests ---
-
-    @patch('fiona.listlayers')
-    @patch('fiona.open')
-    @patch('os.makedirs')
-    @patch('os.listdir')
-    @patch('os.path.isfile')
-    @patch('os.path.isdir')
-    @patch('os.remove')
-    @patch('shutil.rmtree')
-    def test_export_geopackage_layer_to_geojson_success(
-        self, 
-        mock_rmtree: MagicMock, 
-        mock_remove: MagicMock, 
-        mock_isdir: MagicMock, 
-        mock_isfile: MagicMock, 
-        mock_listdir: MagicMock, 
-        mock_makedirs: MagicMock, 
-        mock_fiona_open: MagicMock, 
-        mock_listlayers: MagicMock, 
-        layer_manager: LayerManager,
-        mock_file_manager: MagicMock
+    def test_stream_geopackage_layer_as_geojson(
+        self, layer_manager: LayerManager, mock_file_manager: MagicMock, tmp_path
     ) -> None:
         """
-        Test successful conversion of a GeoPackage layer to GeoJSON.
-        Validates:
-        1. Export directory creation and cleanup of existing files/folders.
-        2. Proper identification of the first layer in the GPKG.
-        3. Correct feature iteration and writing to the new GeoJSON file.
+        Streams a real GeoPackage layer as one valid FeatureCollection, in several chunks.
         """
-        layer_id = "test_layer"
-        export_dir = os.path.join(mock_file_manager.temp_dir, "export")
-        expected_output_path = os.path.join(export_dir, f"{layer_id}.geojson")
-
-        # Mock directory cleanup: one file and one directory exists
-        mock_listdir.return_value = ["old_file.txt", "old_subdir"]
-        mock_isfile.side_effect = lambda path: "old_file.txt" in path
-        mock_isdir.side_effect = lambda path: "old_subdir" in path
-
-        # Mock fiona layer discovery
-        mock_listlayers.return_value = ["layer_one"]
+        import geopandas as gpd
+        from shapely.geometry import Point
 
-        # Mock fiona source and destination context managers
-        mock_src = MagicMock()
-        mock_src.crs = "EPSG:4326"
-        mock_src.schema = {"properties": {"id": "int"}, "geometry": "Point"}
-        mock_src.__iter__.return_value = [{"type": "Feature", "properties": {"id": 1}}]
-        
-        mock_dst = MagicMock()
-        
-        # side_effect to return mock_src then mock_dst for the two fiona.open calls
-        mock_fiona_open.side_effect = [
-            MagicMock(__enter__=MagicMock(return_value=mock_src)),
-            MagicMock(__enter__=MagicMock(return_value=mock_dst))
-        ]
+        mock_file_manager.layers_dir = str(tmp_path)
+        gdf = gpd.GeoDataFrame(
+            {"name": [f"p{i}" for i in range(2500)]},
+            geometry=[Point(i, i) for i in range(2500)],
+            crs="EPSG:4326"
+        )
+        gdf.to_file(tmp_path / "points.gpkg", layer="points", driver="GPKG")
 
-        result_path = layer_manager.export_geopackage_layer_to_geojson(layer_id)
+        chunks = list(layer_manager.stream_geopackage_layer_as_geojson("points"))
 
-        # Assertions
-        assert result_path == expected_output_path
-        mock_makedirs.assert_called_once_with(export_dir, exist_ok=True)
-        
-        # Verify cleanup logic
-        mock_remove.assert_called_once()  # For old_file.txt
-        mock_rmtree.assert_called_once()  # For old_subdir
-        
-        # Verify writing process
-        assert mock_dst.write.called
-        mock_dst.write.assert_called_with({"type": "Feature", "properties": {"id": 1}})
+        assert len(chunks) > 2
+        collection = json.loads(b"".join(chunks))
+        assert collection["type"] == "FeatureCollection"
+        assert len(collection["features"]) == 2500
+        assert collection["features"][3]["properties"]["name"] == "p3"
+        assert collection["features"][3]["geometry"]["coordinates"] == [3.0, 3.0]
 
-    @patch('fiona.listlayers')
-    def test_export_geopackage_layer_to_geojson_no_layers_error(
-        self, 
-        mock_listlayers: MagicMock, 
-        layer_manager: LayerManager
+    def test_stream_geopackage_layer_as_geojson_feature_encoding(
+        self, layer_manager: LayerManager, mock_file_manager: MagicMock, tmp_path
     ) -> None:
         """
-        Edge Case: Test that a ValueError is raised when the GeoPackage 
-        provided has no layers inside.
+        Feature ids, datetimes, missing values and empty geometries are encoded as GeoJSON.
         """
-        mock_listlayers.return_value = [] # Empty layer list
-        
-        with patch('os.makedirs'), patch('os.listdir', return_value=[]):
-            with pytest.raises(ValueError, match="No layers found in the GeoPackage."):
-                layer_manager.export_geopackage_layer_to_geojson("empty_gpkg")
+        import geopandas as gpd
+        import pandas as pd
+        from shapely.geometry import Point
 
-    @patch('fiona.listlayers')
-    def test_export_geopackage_layer_to_geojson_fiona_exception(
-        self, 
-        mock_listlayers: MagicMock, 
-        layer_manager: LayerManager
-    ) -> None:
-        """
-        Test general exception handling (e.g., corrupted file or fiona error).
-        Validates that the error is caught and re-raised as a descriptive ValueError.
-        """
-        # Simulate a crash during layer listing
-        mock_listlayers.side_effect = Exception("Fiona system error")
-        
-        with patch('os.makedirs'), patch('os.listdir', return_value=[]):
-            with pytest.raises(ValueError, match="Failed to convert GeoPackage to GeoJSON: Fiona system error"):
-                layer_manager.export_geopackage_layer_to_geojson("corrupted")
+        mock_file_manager.layers_dir = str(tmp_path)
+        gdf = gpd.GeoDataFrame(
+            {"value": [1, 2], "when": pd.to_datetime(["2024-01-02", None])},
+            geometry=[Point(1, 2), None],
+            crs="EPSG:4326"
+        )
+        gdf.to_file(tmp_path / "mixed.gpkg", layer="mixed", driver="GPKG")
 
-    @patch('os.listdir')
-    @patch('os.path.isfile')
-    @patch('os.path.isdir')
-    @patch('os.remove')
-    @patch('shutil.rmtree')
-    @patch('os.path.join', side_effect=os.path.join)  # Use real join logic to verify paths
-    def test_export_geopackage_layer_to_geojson_cleanup_logic_only(
-        self,
-        mock_join: MagicMock,
-        mock_rmtree: MagicMock,
-        mock_remove: MagicMock,
-        mock_isdir: MagicMock,
-        mock_isfile: MagicMock,
-        mock_listdir: MagicMock,
-        layer_manager: LayerManager,
-        mock_file_manager: MagicMock
+        collection = json.loads(b"".join(layer_manager.stream_geopackage_layer_as_geojson("mixed")))
+
+        assert collection["features"] == [
+            {"type": "Feature", "id": "1", "properties": {"value": 1, "when": "2024-01-02T00:00:00"},
+             "geometry": {"type": "Point", "coordinates": [1.0, 2.0]}},
+            {"type": "Feature", "id": "2", "properties": {"value": 2, "when": None}, "geometry": None},
+        ]
+
+    @patch('App.LayerManager.pyogrio.list_layers')
+    def test_stream_geopackage_layer_as_geojson_no_layers_error(
+        self, mock_list_layers: MagicMock, layer_manager: LayerManager
     ) -> None:
         """
-        Specifically tests the cleanup loop to ensure it handles mixed 
-        files and directories in the export folder correctly.
+        Errors are raised before streaming starts, so the API can still answer with an error.
         """
-        # Define paths relative to the mock file manager
-        export_dir = os.path.join(mock_file_manager.temp_dir, "export")
-        file_to_delete = "f1.txt"
-        dir_to_delete = "d1_dir"
-        
-        mock_listdir.return_value = [file_to_delete, dir_to_delete]
-        
-        # Configure mocks to identify f1 as a file and d1 as a directory
-        mock_isfile.side_effect = lambda p: file_to_delete in p
-        mock_isdir.side_effect = lambda p: dir_to_delete in p
-        
-        # Stop execution after the cleanup loop by forcing an error on the next line
-        with patch('os.makedirs'), \
-             patch('fiona.listlayers', side_effect=RuntimeError("Interrupt")):
-            
-            try:
-                layer_manager.export_geopackage_layer_to_geojson("test_id")
-            except ValueError:
-                pass # This catch is expected due to the 'Interrupt'
-            
-            # Verify the exact paths were targeted for removal
-            expected_file_path = os.path.join(export_dir, file_to_delete)
-            expected_dir_path = os.path.join(export_dir, dir_to_delete)
-            
-            mock_remove.assert_called_once_with(expected_file_path)
-            mock_rmtree.assert_called_once_with(expected_dir_path)
+        mock_list_layers.return_value = np.empty((0, 2), dtype=object)
+        with pytest.raises(ValueError, match="No layers found in the GeoPackage."):
+            layer_manager.stream_geopackage_layer_as_geojson("empty_gpkg")
+
+        mock_list_layers.side_effect = Exception("GDAL system error")
+        with pytest.raises(ValueError, match="Failed to convert GeoPackage to GeoJSON: GDAL system error"):
+            layer_manager.stream_geopackage_layer_as_geojson("corrupted")
 
     # --- Utility & Helper Methods ---
 
@@ -664,208 +718,201 @@ class TestLayerManager:
 
     # --- __convert_raster_system_coordinates Method Tests ---
 
-    @patch('shutil.copy')
-    @patch('os.remove')
-    @patch('rioxarray.open_rasterio')
-    def test_convert_raster_system_coordinates_success(
-        self, 
-        mock_open_rasterio: MagicMock, 
-        mock_remove: MagicMock, 
-        mock_copy: MagicMock, 
-        layer_manager: LayerManager
-    ) -> None:
+    @staticmethod
+    def _write_test_raster(path, crs="EPSG:3857", origin=(-20000, 20000), nodata=None):
+        """Write a small single-band GeoTIFF for reprojection tests."""
+        import rasterio
+        from affine import Affine
+
+        data = np.arange(64 * 64, dtype="uint16").reshape(1, 64, 64)
+        with rasterio.open(
+            path, "w", driver="GTiff", width=64, height=64, count=1, dtype="uint16",
+            crs=crs, transform=Affine(625, 0, origin[0], 0, -625, origin[1]), nodata=nodata
+        ) as dst:
+            dst.write(data)
+
+    def test_convert_raster_system_coordinates_success(self, layer_manager: LayerManager, tmp_path) -> None:
         """
         Test successful raster CRS conversion.
         Validates that:
-        1. A temporary file is created via shutil.copy.
-        2. The raster is reprojected and saved to the original path.
-        3. The temporary file is cleaned up.
+        1. The reprojected raster replaces the original path in the target CRS.
+        2. The reprojection is written to a sibling file (no upfront copy, nothing left behind).
+        """
+        import rasterio
+
+        raster_path = tmp_path / "original.tif"
+        self._write_test_raster(raster_path)
+
+        with patch('shutil.copy') as mock_copy, \
+             patch('App.LayerManager.os.replace', wraps=os.replace) as mock_replace:
+            result = LayerManager._LayerManager__convert_raster_system_coordinates(str(raster_path), "EPSG:4326")
+
+        assert result == str(raster_path)
+        mock_copy.assert_not_called()
+
+        converted_path = mock_replace.call_args.args[0]
+        assert os.path.dirname(converted_path) == str(tmp_path)
+        assert converted_path.endswith("_original.tif")
+        assert os.listdir(tmp_path) == ["original.tif"]
+
+        with rasterio.open(raster_path) as src:
+            assert src.crs.to_string() == "EPSG:4326"
+            assert src.count == 1
+            assert src.dtypes[0] == "uint16"
+            assert src.read(1).max() > 0
+
+    @pytest.mark.parametrize("source_nodata, expected_nodata", [
+        (None, 65535),  # Undeclared: the largest uint16 value
+        (7, 7),         # Declared on the source: kept as is
+    ])
+    def test_convert_raster_system_coordinates_preserves_nodata(
+        self, layer_manager: LayerManager, tmp_path, source_nodata, expected_nodata
+    ) -> None:
         """
-        raster_path = "original.tif"
-        target_crs = "EPSG:4326"
-        temp_path = "very_complex_raster_name_temp.tiff"
+        Pixels outside the rotated source footprint are written as nodata,
+        and the converted GeoTIFF declares that nodata value.
+        """
+        import rasterio
 
-        # Mock rioxarray flow
-        mock_raster = MagicMock()
-        mock_converted = MagicMock()
-        
-        # Setup context manager and reprojection chain
-        mock_open_rasterio.return_value.__enter__.return_value = mock_raster
-        mock_raster.rio.reproject.return_value = mock_converted
+        # Far from the UTM central meridian, so the footprint is visibly rotated in EPSG:4326
+        raster_path = tmp_path / "utm.tif"
+        self._write_test_raster(raster_path, crs="EPSG:32633", origin=(200000, 6500000), nodata=source_nodata)
 
-        # Execute private static method
-        result = LayerManager._LayerManager__convert_raster_system_coordinates(raster_path, target_crs)
+        LayerManager._LayerManager__convert_raster_system_coordinates(str(raster_path), "EPSG:4326")
 
-        # Assertions
-        assert result == raster_path
-        mock_copy.assert_called_once_with(raster_path, temp_path)
-        mock_raster.rio.reproject.assert_called_once_with(target_crs)
-        mock_converted.rio.to_raster.assert_called_once_with(raster_path)
-        mock_remove.assert_called_once_with(temp_path)
+        with rasterio.open(raster_path) as src:
+            assert src.nodata == expected_nodata
+            band = src.read(1)
+            valid = src.read_masks(1) > 0
 
-    @patch('shutil.copy')
-    @patch('rioxarray.open_rasterio')
+        assert band[0, 0] == expected_nodata
+        assert not valid.all()
+        assert (band[~valid] == expected_nodata).all()
+        assert 0 in band[valid]
+
+    @patch('rasterio.open')
     def test_convert_raster_system_coordinates_failure(
         self, 
-        mock_open_rasterio: MagicMock, 
-        mock_copy: MagicMock, 
+        mock_rasterio_open: MagicMock, 
         layer_manager: LayerManager
     ) -> None:
         """
         Test exception handling during raster conversion.
         Validates that a ValueError is raised when reprojection logic fails.
         """
-        raster_path = "faulty.tif"
-        
-        # Simulate a failure during the reprojection step
-        mock_raster = MagicMock()
-        mock_raster.rio.reproject.side_effect = Exception("Projection engine failed")
-        mock_open_rasterio.return_value.__enter__.return_value = mock_raster
+        mock_rasterio_open.side_effect = Exception("Projection engine failed")
 
         # Verify the exception is wrapped in a ValueError with the correct prefix
         with pytest.raises(ValueError, match="Error converting tif CRS: Projection engine failed"):
-            LayerManager._LayerManager__convert_raster_system_coordinates(raster_path)
+            LayerManager._LayerManager__convert_raster_system_coordinates("faulty.tif")
 
-    @patch('shutil.copy', side_effect=OSError("Permission denied"))
-    def test_convert_raster_system_coordinates_copy_failure(
+    def test_convert_raster_system_coordinates_write_failure_cleans_up(
         self, 
-        mock_copy: MagicMock, 
-        layer_manager: LayerManager
+        layer_manager: LayerManager,
+        tmp_path
     ) -> None:
         """
-        Edge Case: Test failure at the initial file system level (copying).
-        
-        Note: Because shutil.copy is called before the try block in the source code,
-        this will raise the raw OSError rather than a ValueError.
+        Edge Case: writing the converted raster fails midway.
+        The partial sibling file is removed and the original is left untouched.
         """
-        # We expect OSError here because it occurs on line 2 of the method,
-        # which is outside the try/except block.
-        with pytest.raises(OSError, match="Permission denied"):
-            LayerManager._LayerManager__convert_raster_system_coordinates("source.tif")
+        raster_path = tmp_path / "source.tif"
+        self._write_test_raster(raster_path)
+        original_bytes = raster_path.read_bytes()
+
+        def partial_write(src, path, **kwargs):
+            with open(path, "wb") as f:
+                f.write(b"partial")
+            raise OSError("No space left on device")
+
+        with patch('App.LayerManager.rio_copy', side_effect=partial_write):
+            with pytest.raises(ValueError, match="No space left on device"):
+                LayerManager._LayerManager__convert_raster_system_coordinates(str(raster_path))
+
+        assert os.listdir(tmp_path) == ["source.tif"]
+        assert raster_path.read_bytes() == original_bytes
 
     # --- __retrieve_spatial_layers_from_incoming_gpkg Method Tests ---
 
-    @patch('fiona.listlayers')
-    @patch('fiona.open')
+    @patch('App.LayerManager.pyogrio.list_layers')
     def test_retrieve_spatial_layers_success(
         self, 
-        mock_fiona_open: MagicMock, 
-        mock_listlayers: MagicMock, 
+        mock_list_layers: MagicMock, 
         layer_manager: LayerManager
     ) -> None:
         """
         Test successful retrieval and filtering of spatial layers.
         Validates:
         1. Correctly identifies layers with valid geometry.
-        2. Correctly skips layers with None or empty geometry strings.
+        2. Correctly skips layers with None or empty geometry types.
+        3. The GeoPackage is listed with a single call.
         """
         gpkg_path = "valid_data.gpkg"
         # List of layers: spatial, non-spatial (None), and non-spatial ("None")
-        mock_listlayers.return_value = ["spatial_layer", "table_layer", "ghost_layer"]
-
-        # Define schema responses for the three layers
-        mock_src_spatial = MagicMock()
-        mock_src_spatial.schema = {"geometry": "Point"}
-        
-        mock_src_table = MagicMock()
-        mock_src_table.schema = {"geometry": None}
-        
-        mock_src_ghost = MagicMock()
-        mock_src_ghost.schema = {"geometry": "None"}
-
-        # Configure fiona.open to return different contexts based on the layer requested
-        mock_fiona_open.side_effect = [
-            MagicMock(__enter__=MagicMock(return_value=mock_src_spatial)),
-            MagicMock(__enter__=MagicMock(return_value=mock_src_table)),
-            MagicMock(__enter__=MagicMock(return_value=mock_src_ghost))
-        ]
+        mock_list_layers.return_value = np.array([
+            ["spatial_layer", "Point"],
+            ["table_layer", None],
+            ["ghost_layer", "None"]
+        ], dtype=object)
 
         result = LayerManager._LayerManager__retrieve_spatial_layers_from_incoming_gpkg(gpkg_path)
 
         assert result == ["spatial_layer"]
-        assert len(result) == 1
-        assert mock_fiona_open.call_count == 3
+        mock_list_layers.assert_called_once_with(gpkg_path)
 
-    @patch('fiona.listlayers')
+    def test_retrieve_spatial_layers_real_gpkg(self, layer_manager: LayerManager, tmp_path) -> None:
+        """Test that attribute-only tables of a real GeoPackage are skipped."""
+        gpkg_path = str(tmp_path / "mixed.gpkg")
+        gpd.GeoDataFrame({"a": [1]}, geometry=[Point(0, 0)], crs="EPSG:4326").to_file(
+            gpkg_path, layer="points", driver="GPKG"
+        )
+        pyogrio.write_dataframe(pd.DataFrame({"b": [1]}), gpkg_path, layer="lookup", driver="GPKG")
+
+        result = LayerManager._LayerManager__retrieve_spatial_layers_from_incoming_gpkg(gpkg_path)
+
+        assert result == ["points"]
+
+    @patch('App.LayerManager.pyogrio.list_layers')
     def test_retrieve_spatial_layers_invalid_gpkg(
         self, 
-        mock_listlayers: MagicMock, 
+        mock_list_layers: MagicMock, 
         layer_manager: LayerManager
     ) -> None:
         """Test that a corrupted or invalid file raises a descriptive ValueError."""
-        mock_listlayers.side_effect = Exception("File format not recognized")
+        mock_list_layers.side_effect = Exception("File format not recognized")
         
         with pytest.raises(ValueError, match="Invalid GeoPackage: File format not recognized"):
             LayerManager._LayerManager__retrieve_spatial_layers_from_incoming_gpkg("corrupt.gpkg")
 
-    @patch('fiona.listlayers')
+    @patch('App.LayerManager.pyogrio.list_layers')
     def test_retrieve_spatial_layers_empty_gpkg(
         self, 
-        mock_listlayers: MagicMock, 
+        mock_list_layers: MagicMock, 
         layer_manager: LayerManager
     ) -> None:
         """Test that a GeoPackage with zero layers raises an error."""
-        mock_listlayers.return_value = []
+        mock_list_layers.return_value = np.empty((0, 2), dtype=object)
         
         with pytest.raises(ValueError, match="GeoPackage contains no layers."):
             LayerManager._LayerManager__retrieve_spatial_layers_from_incoming_gpkg("empty.gpkg")
 
-    @patch('fiona.listlayers')
-    @patch('fiona.open')
+    @patch('App.LayerManager.pyogrio.list_layers')
     def test_retrieve_spatial_layers_no_valid_spatial_found(
         self, 
-        mock_fiona_open: MagicMock, 
-        mock_listlayers: MagicMock, 
+        mock_list_layers: MagicMock, 
         layer_manager: LayerManager
     ) -> None:
         """
         Test edge case where layers exist but none are spatial.
         Ensures the final ValueError is raised if the filtered list is empty.
         """
-        mock_listlayers.return_value = ["metadata_table"]
-        
-        mock_src = MagicMock()
-        mock_src.schema = {"geometry": ""}  # Empty geometry string
-        mock_fiona_open.return_value.__enter__.return_value = mock_src
+        mock_list_layers.return_value = np.array([["metadata_table", ""]], dtype=object)
 
         with pytest.raises(ValueError, match="No valid spatial layers found in GeoPackage."):
             LayerManager._LayerManager__retrieve_spatial_layers_from_incoming_gpkg("tables_only.gpkg")
 
-    @patch('fiona.listlayers')
-    @patch('fiona.open')
-    def test_retrieve_spatial_layers_handles_fiona_errors_gracefully(
-        self, 
-        mock_fiona_open: MagicMock, 
-        mock_listlayers: MagicMock, 
-        layer_manager: LayerManager
-    ) -> None:
-        """
-        Test that individual layer reading errors (FionaValueError or general Exception)
-        do not crash the process and simply cause the layer to be skipped.
-        """
-        mock_listlayers.return_value = ["error_layer", "good_layer"]
-        
-        # First call fails, second call succeeds
-        mock_src_good = MagicMock()
-        mock_src_good.schema = {"geometry": "Polygon"}
-        
-        # We need to import FionaValueError or mock it if not available in context
-        # Assuming it's accessible via fiona
-        from fiona.errors import FionaValueError
-
-        mock_fiona_open.side_effect = [
-            FionaValueError("Cannot read extent"),
-            MagicMock(__enter__=MagicMock(return_value=mock_src_good))
-        ]
-
-        result = LayerManager._LayerManager__retrieve_spatial_layers_from_incoming_gpkg("mixed.gpkg")
-
-        assert result == ["good_layer"]
-        assert len(result) == 1
-
     # --- __get_gpkg_metadata Method Tests ---
 
-    @patch('fiona.listlayers')
+    @patch('App.LayerManager.pyogrio.list_layers')
     @patch('geopandas.read_file')
     def test_get_gpkg_metadata_success(
         self, 
@@ -879,7 +926,7 @@ class TestLayerManager:
         """
         gpkg_path = "data.gpkg"
         crs_original = "EPSG:3857"
-        mock_listlayers.return_value = ["layer_one"]
+        mock_listlayers.return_value = np.array([["layer_one", "Polygon"]], dtype=object)
 
         # Mock GeoDataFrame
         mock_gdf = MagicMock()
@@ -907,7 +954,7 @@ class TestLayerManager:
         assert result["feature_count"] == 100
         assert result["bounding_box"] == [0.0, 0.0, 1.0, 1.0]
 
-    @patch('fiona.listlayers')
+    @patch('App.LayerManager.pyogrio.list_layers')
     @patch('geopandas.read_file')
     def test_get_gpkg_metadata_empty_gdf(
         self, 
@@ -919,7 +966,7 @@ class TestLayerManager:
         Edge Case: Test metadata extraction when the GeoDataFrame is empty.
         Ensures geometry_type returns None instead of crashing.
         """
-        mock_listlayers.return_value = ["empty_layer"]
+        mock_listlayers.return_value = np.array([["empty_layer", "Point"]], dtype=object)
         
         mock_gdf = MagicMock()
         mock_gdf.empty = True
@@ -939,7 +986,7 @@ class TestLayerManager:
         assert result["crs"] is None
         assert result["feature_count"] == 0
 
-    @patch('fiona.listlayers', side_effect=Exception("Fiona read error"))
+    @patch('App.LayerManager.pyogrio.list_layers', side_effect=Exception("GDAL read error"))
     def test_get_gpkg_metadata_exception(
         self, 
         mock_listlayers: MagicMock, 
@@ -949,7 +996,7 @@ class TestLayerManager:
         Test exception handling when reading the GeoPackage fails.
         Validates that errors are caught and re-raised as ValueErrors with the correct prefix.
         """
-        with pytest.raises(ValueError, match="Error reading GeoPackage: Fiona read error"):
+        with pytest.raises(ValueError, match="Error reading GeoPackage: GDAL read error"):
             LayerManager._LayerManager__get_gpkg_metadata("corrupt.gpkg", "EPSG:4326")
 
     # --- __get_raster_metadata Method Tests ---
@@ -1306,8 +1353,7 @@ class TestLayerManager:
         """
         zip_path = "/tmp/test.zip"
         # Mocking os.remove specifically for the second try-block
-        with patch('zipfile.ZipFile'), \
-             patch('os.listdir', return_value=['test.shp']), \
+        with patch('zipfile.ZipFile', **_zip_with_members(['test.shp'])), \
              patch('os.remove', side_effect=Exception("Permission Denied")):
             
             with pytest.raises(ValueError, match="Failed to delete the zip file after extraction: Permission Denied"):
@@ -1318,9 +1364,8 @@ class TestLayerManager:
         Test branch: "Error reading shapefile with GeoPandas:".
         Triggers exception during gpd.read_file and ensures temp directory cleanup.
         """
-        with patch('zipfile.ZipFile'), \
+        with patch('zipfile.ZipFile', **_zip_with_members(['valid.shp'])), \
              patch('os.remove'), \
-             patch('os.listdir', return_value=['valid.shp']), \
              patch('geopandas.read_file', side_effect=Exception("Fiona Error")), \
              patch('shutil.rmtree') as mock_rmtree:
             
@@ -1338,9 +1383,8 @@ class TestLayerManager:
         mock_gdf = MagicMock()
         mock_gdf.crs = None
         
-        with patch('zipfile.ZipFile'), \
+        with patch('zipfile.ZipFile', **_zip_with_members(['test.shp'])), \
              patch('os.remove'), \
-             patch('os.listdir', return_value=['test.shp']), \
              patch('geopandas.read_file', return_value=mock_gdf), \
              patch('shutil.rmtree') as mock_rmtree:
             
@@ -1359,9 +1403,8 @@ class TestLayerManager:
         mock_gdf.crs.to_string.return_value = "EPSG:3857"
         mock_metadata = {"crs": "EPSG:4326", "bounds": [0, 0, 1, 1]}
         
-        with patch('zipfile.ZipFile'), \
+        with patch('zipfile.ZipFile', **_zip_with_members(['test.shp'])), \
              patch('os.remove'), \
-             patch('os.listdir', return_value=['test.shp']), \
              patch('geopandas.read_file', return_value=mock_gdf), \
              patch.object(LayerManager, '_LayerManager__get_gpkg_metadata', return_value=mock_metadata), \
              patch.object(LayerManager, '_LayerManager__move_to_permanent'):
@@ -1380,9 +1423,8 @@ class TestLayerManager:
         mock_gdf = MagicMock()
         mock_gdf.crs.to_string.return_value = "EPSG:4326"
         
-        with patch('zipfile.ZipFile'), \
+        with patch('zipfile.ZipFile', **_zip_with_members(['test.shp'])), \
              patch('os.remove'), \
-             patch('os.listdir', return_value=['test.shp']), \
              patch('geopandas.read_file', return_value=mock_gdf):
             
             # Simulate failure during the writing process
@@ -5,11 +5,12 @@ import json
 import io
 import uuid
 import os
+import tempfile
 import geopandas as gpd
 import pandas as pd
 import numpy as np
 from unittest.mock import MagicMock, mock_open, patch
-from flask import Flask, Response, jsonify
+from flask import Flask, Response, jsonify, request
 from werkzeug.exceptions import BadRequest, NotFound
 from flask.testing import FlaskClient
 from typing import Any, Dict
@@ -67,12 +68,37 @@ class TestApp:
 
     def test_generic_exception_handler(self, client, mock_managers):
         """Tests the global exception handler when an unexpected error occurs."""
-        mock_managers["basemap"].list_basemaps.side_effect = Exception("Unexpected failure")
+        mock_managers["basemap"].list_basemaps_json.side_effect = Exception("Unexpected failure")
         response = client.get('/basemaps')
         assert response.status_code == 500
         data = response.get_json()
         assert data["error"]["message"] == "Internal Server Error"
 
+    def test_http_exception_handler_returns_json_and_keeps_headers(self, client):
+        """Tests that HTTP errors are JSON bodies and keep exception headers such as Allow."""
+        response = client.put('/basemaps')
+        assert response.status_code == 405
+        assert response.mimetype == "application/json"
+        assert "GET" in response.headers["Allow"]
+        assert response.get_json()["error"]["code"] == 405
+        assert response.get_json()["error"]["name"] == "Method Not Allowed"
+
+    def test_json_provider_serializes_numpy_values(self, client, mock_managers):
+        """Tests that jsonify encodes numpy scalars and arrays through the orjson provider."""
+        mock_managers["layer"].get_layer_information.return_value = {
+            "bands": np.int64(3), "resolution": np.array([0.5, 1.5])
+        }
+        response = client.get('/layers/L1/information')
+        assert response.status_code == 200
+        assert response.get_json() == {"layer_id": "L1", "info": {"bands": 3, "resolution": [0.5, 1.5]}}
+
+    def test_json_provider_rejects_malformed_body(self, client, mock_managers):
+        """Tests that a malformed JSON body is still reported as 400 by the orjson provider."""
+        response = client.post(
+            '/scripts/some-id', data=b'{"parameters": ', content_type='application/json'
+        )
+        assert response.status_code == 400
+
     # --- Script Management Tests ---
 
     def test_add_script_no_file(self, client):
@@ -195,6 +221,120 @@ class TestApp:
         assert response.status_code == 400
         assert b"exceeds the maximum allowed size" in response.data
 
+    def test_add_layer_raw_body_streamed_to_disk(self, client, mock_managers, tmp_path):
+        """Raw octet-stream uploads are written to the temp dir without multipart parsing."""
+        mock_managers["file"].temp_dir = str(tmp_path)
+        mock_managers["layer"].check_layer_name_exists.return_value = False
+        saved = {}
+
+        def process(temp_path, file_name, extension, selected_layers):
+            with open(temp_path, "rb") as f:
+                saved["content"] = f.read()
+            return "layer_1", {"name": file_name}
+
+        mock_managers["layer"].process_layer_file.side_effect = process
+
+        response = client.post(
+            "/layers?filename=roads.gpkg&layers=a&layers=b",
+            data=b"gpkg-bytes",
+            content_type="application/octet-stream",
+        )
+
+        assert response.status_code == 200
+        assert saved["content"] == b"gpkg-bytes"
+        kwargs = mock_managers["layer"].process_layer_file.call_args.kwargs
+        assert kwargs["file_name"] == "roads"
+        assert kwargs["extension"] == ".gpkg"
+        assert kwargs["selected_layers"] == ["a", "b"]
+        # Temp file cleaned up afterwards
+        assert not (tmp_path / "roads.gpkg").exists()
+
+    def test_add_layer_raw_body_requires_filename(self, client, mock_managers):
+        """Raw uploads without a 'filename' query parameter are rejected."""
+        response = client.post("/layers", data=b"bytes", content_type="application/octet-stream")
+
+        assert response.status_code == 400
+        assert b"filename" in response.data
+
+    def test_request_body_over_max_content_length_rejected(self, client, mock_managers):
+        """A body above MAX_CONTENT_LENGTH is refused with 413 before the handler reads it."""
+        with patch.dict(app.config, {"MAX_CONTENT_LENGTH": 10}):
+            response = client.post('/scripts/some-id', json={"parameters": {}, "layers": ["a" * 50]})
+
+        assert response.status_code == 413
+        assert response.get_json()["error"]["code"] == 413
+        mock_managers["script"].run_script.assert_not_called()
+
+        # The rejected run must not leave the script marked as running
+        from App.app import running_scripts
+        assert running_scripts["some-id"]["status"] == "failed"
+
+    def test_uploaded_files_spool_to_temp_dir(self, tmp_path, mock_managers):
+        """Multipart file parts are written to file_manager.temp_dir, never kept in memory."""
+        from App.app import UploadRequest
+        mock_managers["file"].temp_dir = str(tmp_path)
+
+        with patch("App.app.tempfile.TemporaryFile", wraps=tempfile.TemporaryFile) as mock_tmp, \
+                app.test_request_context(
+                    '/layers', method='POST',
+                    data={'file': (io.BytesIO(b"small"), 'points.geojson')},
+                    content_type='multipart/form-data'
+                ):
+            assert isinstance(request, UploadRequest)
+            assert request.files['file'].stream.read() == b"small"
+
+        mock_tmp.assert_called_once_with("wb+", dir=str(tmp_path))
+
+    def test_add_layer_raw_body_size_exceeded(self, client, mock_managers):
+        """Raw uploads larger than MAX_LAYER_FILE_SIZE are rejected before being read."""
+        mock_managers["layer"].MAX_LAYER_FILE_SIZE = 5
+
+        with patch("App.app._save_request_stream") as mock_save:
+            response = client.post(
+                "/layers?filename=big.tif", data=b"a" * 10, content_type="application/octet-stream"
+            )
+
+        assert response.status_code == 400
+        assert b"exceeds the maximum allowed size" in response.data
+        mock_save.assert_not_called()
+
+    @pytest.mark.parametrize("filename, name_exists, message", [
+        ("notes.txt", False, b"File extension '.txt' is not supported."),
+        ("roads.gpkg", True, b"A Layer with the same name already exists"),
+    ])
+    def test_add_layer_raw_body_rejected_before_read(self, client, mock_managers, filename, name_exists, message):
+        """Raw uploads with an unsupported extension or a taken name are rejected before being read."""
+        mock_managers["layer"].check_layer_name_exists.return_value = name_exists
+
+        with patch("App.app._save_request_stream") as mock_save:
+            response = client.post(
+                f"/layers?filename={filename}", data=b"bytes", content_type="application/octet-stream"
+            )
+
+        assert response.status_code == 400
+        assert message in response.data
+        mock_save.assert_not_called()
+        mock_managers["layer"].process_layer_file.assert_not_called()
+
+    def test_add_layer_raw_body_partial_write_cleaned_up(self, client, mock_managers, tmp_path):
+        """A raw upload that fails midway through streaming leaves no partial file behind."""
+        mock_managers["file"].temp_dir = str(tmp_path)
+        mock_managers["layer"].check_layer_name_exists.return_value = False
+
+        def partial_save(destination_path):
+            with open(destination_path, "wb") as f:
+                f.write(b"partial")
+            raise OSError("Connection reset")
+
+        with patch("App.app._save_request_stream", side_effect=partial_save):
+            response = client.post(
+                "/layers?filename=roads.gpkg", data=b"gpkg-bytes", content_type="application/octet-stream"
+            )
+
+        assert response.status_code == 500
+        assert os.listdir(tmp_path) == []
+        mock_managers["layer"].process_layer_file.assert_not_called()
+
     # --- Data Interaction Tests ---
 
     def test_get_layer_attributes_success(self, client, mock_managers):
@@ -239,14 +379,44 @@ class TestApp:
         assert response.status_code == 400
         assert b"does not exist" in response.data
 
+    def test_export_script_builds_zip_in_memory(self, client, mock_managers, tmp_path):
+        """Export of a single script: the archive is built in memory, never under temp_dir."""
+        (tmp_path / "s1.py").write_text("print('hi')\n")
+        mock_managers["file"].scripts_dir = str(tmp_path)
+        mock_managers["file"].temp_dir = str(tmp_path / "missing_temp_dir")
+        mock_managers["script"].get_metadata.return_value = {"name": "S1"}
+
+        response = client.get('/scripts/export/s1')
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/zip"
+        with zipfile.ZipFile(io.BytesIO(response.data)) as zipf:
+            assert sorted(zipf.namelist()) == ["s1.py", "scripts_metadata.json"]
+            assert zipf.read("s1.py") == b"print('hi')\n"
+            assert json.loads(zipf.read("scripts_metadata.json")) == {"name": "S1"}
+
     # --- Map / Tile Interaction Tests ---
 
     def test_list_basemaps_success(self, client, mock_managers):
         """Normal execution: Lists available basemaps."""
-        mock_managers["basemap"].list_basemaps.return_value = [{"id": "bm1", "name": "Basemap 1"}]
+        mock_managers["basemap"].list_basemaps_json.return_value = (
+            b'[{"id":"bm1","name":"Basemap 1"}]', "etag-1"
+        )
         response = client.get('/basemaps')
         assert response.status_code == 200
         assert len(response.get_json()) == 1
+        assert response.headers["ETag"] == '"etag-1"'
+        assert response.cache_control.public
+        assert response.cache_control.max_age == 86400
+
+    def test_list_basemaps_not_modified(self, client, mock_managers):
+        """Conditional request: a matching If-None-Match is answered with 304 and no body."""
+        mock_managers["basemap"].list_basemaps_json.return_value = (
+            b'[{"id":"bm1","name":"Basemap 1"}]', "etag-1"
+        )
+        response = client.get('/basemaps', headers={"If-None-Match": '"etag-1"'})
+        assert response.status_code == 304
+        assert response.data == b""
 
     # --- Tests for GET /scripts/<script_id> ---
 
@@ -664,25 +834,39 @@ class TestApp:
         """
         Test Case: Successful export of a GeoPackage (.gpkg) layer.
         Branch Coverage: 'extension == ".gpkg"' True branch.
-        Expectation: Calls GeoPackage converter, returns file with .geojson download name.
+        Expectation: Streams the converted GeoJSON with a .geojson download name, no temp file.
         """
         # Setup mocks
         layer_id = "test_vector"
         mock_layer_manager.get_layer_extension.return_value = ".gpkg"
-        mock_layer_manager.export_geopackage_layer_to_geojson.return_value = "/tmp/test_vector.geojson"
-        mock_abspath.return_value = "/absolute/tmp/test_vector.geojson"
-        mock_isfile.return_value = True
+        mock_layer_manager.stream_geopackage_layer_as_geojson.return_value = iter(
+            [b'{"type":"FeatureCollection","features":[', b']}']
+        )
         
         # Execution
         response = client.get(f'/layers/{layer_id}')
         
         # Verification
-        mock_layer_manager.export_geopackage_layer_to_geojson.assert_called_once_with(layer_id)
-        mock_send_file.assert_called_once_with(
-            "/absolute/tmp/test_vector.geojson",
-            as_attachment=True,
-            download_name=f"{layer_id}.geojson"
-        )
+        mock_layer_manager.stream_geopackage_layer_as_geojson.assert_called_once_with(layer_id)
+        mock_send_file.assert_not_called()
+        assert response.status_code == 200
+        assert response.mimetype == "application/geo+json"
+        assert response.headers["Content-Disposition"] == f"attachment; filename={layer_id}.geojson"
+        assert response.get_data() == b'{"type":"FeatureCollection","features":[]}'
+
+    @patch('App.app.layer_manager')
+    def test_get_layer_geopackage_download_name_is_quoted(self, mock_layer_manager: MagicMock, client: Any) -> None:
+        """
+        Test Case: A layer id with characters that need quoting in the Content-Disposition header.
+        Expectation: The header value is quoted and escaped by Werkzeug.
+        """
+        mock_layer_manager.get_layer_extension.return_value = ".gpkg"
+        mock_layer_manager.stream_geopackage_layer_as_geojson.return_value = iter([b"{}"])
+
+        response = client.get('/layers/my%20"layer"')
+
+        assert response.status_code == 200
+        assert response.headers["Content-Disposition"] == 'attachment; filename="my \\"layer\\".geojson"'
 
     @patch('App.app.os.path.isfile')
     @patch('App.app.os.path.abspath')
@@ -1109,8 +1293,8 @@ class TestApp:
         
         assert response.status_code == 200
         assert response.get_json()["message"] == "Layer L1 removed"
-        # Verify removal of the uppercase file
-        called_path = mock_remove.call_args[0][0]
+        # Verify removal of the uppercase file (the metadata file is removed after it)
+        called_path = mock_remove.call_args_list[0][0][0]
         assert called_path.endswith(".GPKG")
 
 
@@ -1126,15 +1310,15 @@ class TestApp:
 
         assert "layer_id parameter is required" in str(excinfo.value)
 
-    @patch('fiona.listlayers')  # Patch the library directly
-    @patch('geopandas.read_file')
+    @patch('App.app.pyogrio.list_layers')
+    @patch('App.app.pyogrio.read_dataframe')
     @patch('os.path.isfile')
     def test_extract_table_data_success_with_warnings(
-        self, mock_isfile, mock_read_file, mock_listlayers, client, mock_managers
+        self, mock_isfile, mock_read_dataframe, mock_listlayers, client, mock_managers
     ) -> None:
         """
         Test Case: Successful extraction of vector data with mixed types and null values.
-        Fix: Patched fiona and geopandas globally to avoid ModuleNotFoundError.
+        The attributes are read with pyogrio without decoding the geometry.
         """
         layer_id = "vector_L1"
         # 1. Setup Managers
@@ -1143,16 +1327,14 @@ class TestApp:
         
         # 2. Setup Filesystem/Library mocks
         mock_isfile.return_value = True
-        mock_listlayers.return_value = ['main_layer']
+        mock_listlayers.return_value = np.array([['main_layer', 'Point']], dtype=object)
         
-        # Create a mock GeoDataFrame with a geometry column and a Null value
+        # pyogrio returns a plain DataFrame when read_geometry=False
         data = {
             'id': [1, 2],
-            'name': ['Alpha', None],
-            'geometry': [MagicMock(), MagicMock()]
+            'name': ['Alpha', None]
         }
-        mock_gdf = gpd.GeoDataFrame(data)
-        mock_read_file.return_value = mock_gdf
+        mock_read_dataframe.return_value = pd.DataFrame(data)
         
         # 3. Mock DataManager formatting
         mock_managers["data"].detect_type.return_value = "string"
@@ -1168,6 +1350,95 @@ class TestApp:
         assert 'geometry' not in header_names
         assert any("Null value detected" in w for w in json_data['warnings'])
         mock_managers["data"].insert_to_cache.assert_called_once()
+        mock_read_dataframe.assert_called_once_with(
+            os.path.join(mock_managers["file"].layers_dir, f"{layer_id}.gpkg"),
+            layer='main_layer',
+            read_geometry=False
+        )
+
+    @patch('App.app.pyogrio.list_layers')
+    @patch('App.app.pyogrio.read_dataframe')
+    @patch('os.path.isfile')
+    def test_extract_table_data_formats_columns(
+        self, mock_isfile, mock_read_dataframe, mock_listlayers, client, mock_managers
+    ) -> None:
+        """
+        Test Case: Cells are formatted column by column as Python scalars.
+        Covers: one warning per column containing nulls (None or NaN).
+        """
+        mock_managers["layer"].is_raster.return_value = False
+        mock_managers["data"].check_cache.return_value = None
+        mock_managers["data"].detect_type.return_value = "string"
+        mock_managers["data"].format_value_for_table_view.side_effect = lambda x: type(x).__name__
+
+        mock_isfile.return_value = True
+        mock_listlayers.return_value = np.array([['main_layer', 'Point']], dtype=object)
+        mock_read_dataframe.return_value = pd.DataFrame({
+            'id': [1, 2],
+            'area': [1.5, np.nan],
+        })
+
+        response = client.get('/layers/vector_L1/table')
+
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert json_data['rows'] == [
+            {'id': 'int', 'area': 'float'},
+            {'id': 'int', 'area': 'float'},
+        ]
+        assert json_data['warnings'] == ["Null value detected in field 'area'"]
+        # The header sample keeps the int column as a Python int instead of a row-upcast float
+        sample_values = [c.args[0] for c in mock_managers["data"].detect_type.call_args_list]
+        assert [type(v) for v in sample_values] == [int, float]
+
+    @patch('App.app.pyogrio.list_layers')
+    @patch('App.app.pyogrio.read_dataframe')
+    @patch('os.path.isfile')
+    def test_extract_table_data_layer_without_attributes(
+        self, mock_isfile, mock_read_dataframe, mock_listlayers, client, mock_managers
+    ) -> None:
+        """
+        Edge Case: a layer with features but no attribute columns.
+        Covers: one empty row per feature, matching total_rows.
+        """
+        mock_managers["layer"].is_raster.return_value = False
+        mock_managers["data"].check_cache.return_value = None
+
+        mock_isfile.return_value = True
+        mock_listlayers.return_value = np.array([['main_layer', 'Point']], dtype=object)
+        mock_read_dataframe.return_value = pd.DataFrame(index=range(3))
+
+        response = client.get('/layers/vector_L1/table')
+
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert json_data['headers'] == []
+        assert json_data['rows'] == [{}, {}, {}]
+        assert json_data['total_rows'] == 3
+        assert json_data['warnings'] == []
+
+    @pytest.mark.parametrize("row_count", [0, 1, 4, 5])
+    def test_stream_table_response_batches_rows(self, row_count) -> None:
+        """
+        Test Case: Table payload streamed in several row batches.
+        Covers: batch joining in _stream_table_response yields one valid JSON document.
+        """
+        from App.app import _stream_table_response
+
+        table_data = {
+            "headers": [{"name": "id", "type": "int", "sortable": True}],
+            "rows": [{"id": str(i)} for i in range(row_count)],
+            "total_rows": row_count,
+            "warnings": ["Null value detected in field 'id'"]
+        }
+
+        with app.test_request_context(), patch('App.app.TABLE_STREAM_BATCH_ROWS', 2):
+            response = _stream_table_response(table_data)
+            chunks = list(response.response)
+
+        assert response.mimetype == "application/json"
+        assert len(chunks) == 2 + (row_count + 1) // 2
+        assert json.loads(b"".join(chunks)) == table_data
 
     def test_extract_table_data_from_cache(self, client, mock_managers) -> None:
         """
@@ -1186,6 +1457,34 @@ class TestApp:
         assert response.status_code == 200
         assert response.get_json() == cached_payload
 
+    def test_extract_table_data_compressed_when_accepted(self, client, mock_managers) -> None:
+        """
+        Test Case: The streamed table JSON is compressed for clients that accept it.
+        Covers: small JSON error bodies stay uncompressed (below COMPRESS_MIN_SIZE).
+        """
+        import brotli
+
+        cached_payload = {
+            "headers": [{"name": "name", "type": "string", "sortable": True}],
+            "rows": [{"name": f"feature {i}"} for i in range(2000)],
+            "total_rows": 2000,
+            "warnings": []
+        }
+        mock_managers["layer"].is_raster.return_value = False
+        mock_managers["data"].check_cache.return_value = cached_payload
+
+        response = client.get('/layers/cached_layer/table', headers={"Accept-Encoding": "br"})
+
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == "br"
+        assert json.loads(brotli.decompress(response.data)) == cached_payload
+
+        mock_managers["layer"].is_raster.return_value = True
+        error_response = client.get('/layers/raster_layer/table', headers={"Accept-Encoding": "br"})
+
+        assert error_response.status_code == 400
+        assert "Content-Encoding" not in error_response.headers
+
     def test_extract_table_data_fails_if_raster(self, client, mock_managers) -> None:
         """
         Test Case: Attempting to get table data for a raster layer.
@@ -1214,28 +1513,28 @@ class TestApp:
         assert response.status_code == 400
         assert "Vector layer file not found" in response.get_json()["error"]["description"]
 
-    @patch('fiona.listlayers')
+    @patch('App.app.pyogrio.list_layers')
     @patch('os.path.isfile')
     def test_extract_table_data_empty_gpkg(self, mock_isfile, mock_listlayers, client, mock_managers) -> None:
         """
         Test Case: GeoPackage exists but contains no layers inside.
-        Covers: 'if not layers' branch raising BadRequest.
+        Covers: 'if len(layers) == 0' branch raising BadRequest.
         """
         mock_managers["layer"].is_raster.return_value = False
         mock_managers["data"].check_cache.return_value = None
         mock_isfile.return_value = True
-        mock_listlayers.return_value = [] # Fiona returns empty list
+        mock_listlayers.return_value = np.empty((0, 2), dtype=object)
 
         response = client.get('/layers/empty_gpkg/table')
         
         assert response.status_code == 400
         assert "No layers found in GeoPackage" in response.get_json()["error"]["description"]
 
-    @patch('fiona.listlayers')
-    @patch('geopandas.read_file')
+    @patch('App.app.pyogrio.list_layers')
+    @patch('App.app.pyogrio.read_dataframe')
     @patch('os.path.isfile')
     def test_extract_table_data_empty_dataframe_edge_case(
-        self, mock_isfile, mock_read_file, mock_listlayers, client, mock_managers
+        self, mock_isfile, mock_read_dataframe, mock_listlayers, client, mock_managers
     ) -> None:
         """
         Edge Case: GPKG has a layer but 0 rows of data.
@@ -1249,12 +1548,11 @@ class TestApp:
         
         # 2. Setup Filesystem
         mock_isfile.return_value = True
-        mock_listlayers.return_value = ['empty_layer']
+        mock_listlayers.return_value = np.array([['empty_layer', 'Point']], dtype=object)
         
-        # 3. Create an empty GeoDataFrame with columns but NO data
+        # 3. Create an empty attribute DataFrame with columns but NO data
         # This matches the 'total_rows = 0' logic path
-        mock_gdf = gpd.GeoDataFrame(columns=['attr1', 'geometry'])
-        mock_read_file.return_value = mock_gdf
+        mock_read_dataframe.return_value = pd.DataFrame(columns=['attr1'])
 
         # 4. Execute
         response = client.get('/layers/empty_rows/table')
@@ -1266,7 +1564,7 @@ class TestApp:
         json_data = response.get_json()
         assert json_data['total_rows'] == 0
         assert json_data['rows'] == []
-        # Check that 'attr1' exists in headers but 'geometry' was dropped
+        # Check that 'attr1' exists in headers and no geometry column leaks in
         header_names = [h['name'] for h in json_data['headers']]
         assert 'attr1' in header_names
         assert 'geometry' not in header_names
@@ -1312,16 +1610,38 @@ class TestApp:
     ) -> None:
         """
         Test Case: Uploading a non-GPKG file (e.g., .tif).
-        Covers: Extension validation branch and cleanup.
+        Covers: Extension validation branch, which rejects before saving anything.
         """
         mock_getsize.return_value = 100
         
         data = {'file': (io.BytesIO(b"fake data"), 'raster.tif')}
-        response = client.post('/layers/preview/geopackage', data=data, content_type='multipart/form-data')
+        with patch('werkzeug.datastructures.FileStorage.save') as mock_save:
+            response = client.post('/layers/preview/geopackage', data=data, content_type='multipart/form-data')
 
         assert response.status_code == 400
         assert "only accepts GeoPackage (.gpkg) files" in response.get_json()["error"]["description"]
-        mock_remove.assert_called_once()
+        mock_save.assert_not_called()
+        mock_remove.assert_not_called()
+
+    def test_preview_geopackage_strips_client_path(
+        self, client: FlaskClient, mock_managers, tmp_path
+    ) -> None:
+        """
+        Test Case: Client-supplied filename carries directory components.
+        Covers: Only the basename is used for the temp path, so nothing lands outside temp_dir.
+        """
+        temp_dir = tmp_path / "temp"
+        temp_dir.mkdir()
+        mock_managers["file"].temp_dir = str(temp_dir)
+        mock_managers["layer"].MAX_LAYER_FILE_SIZE = 1000
+        mock_managers["layer"].get_geopackage_layers.return_value = ["roads"]
+
+        data = {'file': (io.BytesIO(b"gpkg"), '../escape.gpkg')}
+        response = client.post('/layers/preview/geopackage', data=data, content_type='multipart/form-data')
+
+        assert response.status_code == 200
+        mock_managers["layer"].get_geopackage_layers.assert_called_once_with(str(temp_dir / "escape.gpkg"))
+        assert not (tmp_path / "escape.gpkg").exists()
 
     @patch('App.app.os.path.getsize')
     @patch('App.app.os.remove')
@@ -1672,6 +1992,32 @@ class TestApp:
         assert data["error"]["code"] == 500
         assert data["error"]["message"] == "Internal Server Error"
         assert data["error"]["details"] == "Unexpected System Error"
+
+    def test_exception_handlers_log_lazily(self, client, mock_managers) -> None:
+        """
+        Test Case: Error handlers pass the exception as a logging argument.
+        The message is only formatted if the record is emitted.
+        """
+        mock_managers["layer"].is_raster.return_value = True
+
+        with patch.object(app.logger, "warning") as mock_warning:
+            client.get('/layers/raster_layer/table')
+
+        fmt, request_id, exc = mock_warning.call_args.args
+        assert fmt == "[%s] HTTP Exception: %s"
+        assert isinstance(exc, BadRequest)
+
+        with patch('App.app.os.path.isfile', return_value=True), \
+             patch.object(app.logger, "error") as mock_error:
+            mock_managers["script"].run_script.side_effect = Exception("boom")
+            client.post('/scripts/any', json={"parameters": {}, "layers": []})
+
+        handler_calls = [
+            c.args for c in mock_error.call_args_list
+            if c.args[0] == "[%s] Unhandled Exception: %s"
+        ]
+        assert len(handler_calls) == 1
+        assert str(handler_calls[0][2]) == "boom"
 # Export all layers tests 
     def test_export_all_layers_success(self, client: FlaskClient, mock_managers) -> None:
         # Arrange layer ids and metadata
@@ -1706,9 +2052,16 @@ class TestApp:
         assert response.status_code == 200
         # ZipFile context was created
         mock_zipfile.assert_called_once()
-        # Two files written into the zip
-        assert mock_zip.write.call_count == 2
+        # Two files streamed into the zip
+        add_file_to_zip = mock_managers["file"].add_file_to_zip
+        assert add_file_to_zip.call_count == 2
+        assert add_file_to_zip.call_args_list[0].args[0] is mock_zip
         mock_managers["layer"].list_layer_ids.assert_called_once()
+        # Fast deflate level; rasters are stored without recompression
+        assert mock_zipfile.call_args.kwargs["compresslevel"] == 1
+        gpkg_call, tif_call = add_file_to_zip.call_args_list
+        assert gpkg_call.kwargs["compress_type"] == zipfile.ZIP_DEFLATED
+        assert tif_call.kwargs["compress_type"] == zipfile.ZIP_STORED
 
     def test_export_all_layers_skips_missing_metadata(self, client: FlaskClient, mock_managers) -> None:
         # Two layer IDs, but first has no metadata
@@ -1738,7 +2091,7 @@ class TestApp:
         assert response.status_code == 200
 
         # First metadata falsy → skipped; only second layer written
-        assert mock_zip.write.call_count == 1
+        assert mock_managers["file"].add_file_to_zip.call_count == 1
         # get_metadata was called twice (for l1 and l2)
         assert mock_managers["layer"].get_metadata.call_count == 2
 
@@ -1974,7 +2327,7 @@ class TestApp:
     def test_load_basemap_success(self, client: FlaskClient, mock_managers: dict) -> None:
         """
         Test Case: Successfully load an existing basemap.
-        Requirement: Branch coverage for 'return jsonify(basemap), 200'.
+        Requirement: Branch coverage for returning the pre-encoded basemap with 200.
         """
         # 1. Setup mock data for the manager
         basemap_id = "osm_standard"
@@ -1984,15 +2337,16 @@ class TestApp:
             "url": "https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png",
             "attribution": "&copy; OpenStreetMap contributors"
         }
-        mock_managers["basemap"].get_basemap.return_value = mock_basemap_data
+        mock_managers["basemap"].get_basemap_json.return_value = json.dumps(mock_basemap_data).encode()
 
         # 2. Execute the GET request
         response = client.get(f'/basemaps/{basemap_id}')
 
         # 3. Assertions
         assert response.status_code == 200
+        assert response.mimetype == "application/json"
         assert response.get_json() == mock_basemap_data
-        mock_managers["basemap"].get_basemap.assert_called_once_with(basemap_id)
+        mock_managers["basemap"].get_basemap_json.assert_called_once_with(basemap_id)
 
     def test_load_basemap_not_found(self, client: FlaskClient, mock_managers: dict) -> None:
         """
@@ -2001,7 +2355,7 @@ class TestApp:
         """
         # 1. Setup: Manager returns None for unknown IDs
         basemap_id = "non_existent_map"
-        mock_managers["basemap"].get_basemap.return_value = None
+        mock_managers["basemap"].get_basemap_json.return_value = None
 
         # 2. Execute the GET request
         response = client.get(f'/basemaps/{basemap_id}')
@@ -2010,7 +2364,7 @@ class TestApp:
         assert response.status_code == 404
         data = response.get_json()
         assert data["error"] == f"Basemap with id {basemap_id} not found"
-        mock_managers["basemap"].get_basemap.assert_called_once_with(basemap_id)
+        mock_managers["basemap"].get_basemap_json.assert_called_once_with(basemap_id)
 
     def test_load_basemap_empty_id(self, client: FlaskClient) -> None:
         """
@@ -2239,22 +2593,20 @@ class TestApp:
             else:
                 pytest.fail("Could not determine the temp_path used by the application")
 
-    @patch('App.app.os.path.exists')
     @patch('App.app.os.remove')
     def test_add_layer_already_exists_no_temp_file(
         self, 
         mock_remove: MagicMock, 
-        mock_exists: MagicMock, 
         client: FlaskClient, 
         mock_managers: dict
     ) -> None:
         """
         Test Case: Edge case where layer exists but temp_path does not exist on disk.
-        Requirement: 100% Branch coverage for 'if os.path.exists(temp_path)' being False.
+        Requirement: a FileNotFoundError from the cleanup is swallowed by _silent_remove.
         """
-        # 1. Setup: Layer exists, but the file system check for temp_path returns False
+        # 1. Setup: Layer exists, but the temp file is already gone at cleanup time
         mock_managers["layer"].layer_exists.return_value = True
-        mock_exists.return_value = False
+        mock_remove.side_effect = FileNotFoundError
 
         data = {
             'file': (io.BytesIO(b"dummy data"), 'test.tif'),
@@ -2265,8 +2617,8 @@ class TestApp:
 
         # 2. Assertions
         assert response.status_code == 400
-        # Ensure os.remove was NOT called because the file didn't exist
-        mock_remove.assert_not_called()
+        # The cleanup was attempted once and its error did not mask the 400
+        mock_remove.assert_called_once()
 
     def test_import_scripts_no_file(self, client: FlaskClient) -> None:
         """Requirement: raises BadRequest if no file is provided."""